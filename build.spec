@@ -33,6 +33,13 @@ a = Analysis(
         'flask',
         'flask_socketio',
         'requests',
+        'numpy',
+        'waitress',
+        # 可选依赖，打包环境中安装了才会生效
+        # （numba未列入：尚未验证打包后的exe，未安装时使用纯Python实现）
+        'orjson',
+        'redis',
+        'flask_session',
     ],
     hookspath=[],
     runtime_hooks=[],
@@ -1,13 +1,103 @@
 import sys
 import traceback
+import atexit
+import functools
 import logging
+import logging.handlers
 import os
-from datetime import datetime
 from PyQt5.QtWidgets import (QApplication, QDialog, QTextEdit, QVBoxLayout, 
-                             QHBoxLayout, QPushButton, QLabel, QMessageBox)
+                             QHBoxLayout, QPushButton, QLabel)
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QIcon, QPixmap, QPainter, QColor, QPen
 
+# 日志系统不可用时的回退错误日志文件，首次使用时打开并复用
+_fallback_log = None
+
+# 已连接availableGeometryChanged信号的屏幕，避免重复连接
+_watched_screens = set()
+
+# 错误对话框样式表，按objectName区分控件，每个对话框只需解析一次
+_DIALOG_CSS = """
+    QLabel#errorIcon {
+        font-size: 48px;
+        margin-right: 10px;
+    }
+    QLabel#errorTitle {
+        font-size: 18px;
+        font-weight: bold;
+        color: #d32f2f;
+    }
+    QLabel#errorSubtitle {
+        color: #666;
+    }
+    QLabel#copyStatus {
+        color: #4CAF50;
+    }
+    QTextEdit {
+        background-color: #f5f5f5;
+        border: 1px solid #ddd;
+        border-radius: 5px;
+        padding: 10px;
+    }
+    QPushButton {
+        color: white;
+        border: none;
+        padding: 8px 16px;
+        border-radius: 4px;
+    }
+    QPushButton#copyButton {
+        background-color: #2196F3;
+    }
+    QPushButton#copyButton:hover {
+        background-color: #1976D2;
+    }
+    QPushButton#closeButton {
+        background-color: #4CAF50;
+    }
+    QPushButton#closeButton:hover {
+        background-color: #45a049;
+    }
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _build_icon():
+    """绘制2048窗口图标，首次调用时生成并缓存（需要QApplication已创建）"""
+    icon_size = 32
+    pixmap = QPixmap(icon_size, icon_size)
+    pixmap.fill(Qt.transparent)
+    
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    
+    # 绘制圆形背景
+    gradient_color = QColor(76, 175, 80)
+    painter.setBrush(gradient_color)
+    painter.setPen(QPen(gradient_color.darker(120), 2))
+    painter.drawEllipse(2, 2, icon_size-4, icon_size-4)
+    
+    # 绘制文字
+    painter.setPen(Qt.white)
+    font = QFont("Arial", 12, QFont.Bold)
+    painter.setFont(font)
+    painter.drawText(pixmap.rect(), Qt.AlignCenter, "2048")
+    
+    painter.end()
+    return QIcon(pixmap)
+
+
+def _watch_screen(screen):
+    """屏幕可用区域变化时清除中心点缓存，每个屏幕只连接一次信号"""
+    if screen not in _watched_screens:
+        screen.availableGeometryChanged.connect(lambda _: _screen_center.cache_clear())
+        _watched_screens.add(screen)
+
+
+@functools.lru_cache(maxsize=1)
+def _screen_center(screen):
+    """计算屏幕可用区域中心点并缓存，主屏幕切换时按新屏幕重新计算"""
+    return screen.availableGeometry().center()
+
 
 class ErrorDialog(QDialog):
     def __init__(self, error_info, parent=None):
@@ -26,47 +116,27 @@ class ErrorDialog(QDialog):
     def setup_window_icon(self):
         """设置窗口图标，与启动动画图标保持一致"""
         try:
-            # 创建2048图标
-            icon_size = 32
-            pixmap = QPixmap(icon_size, icon_size)
-            pixmap.fill(Qt.transparent)
-            
-            painter = QPainter(pixmap)
-            painter.setRenderHint(QPainter.Antialiasing)
-            
-            # 绘制圆形背景
-            gradient_color = QColor(76, 175, 80)
-            painter.setBrush(gradient_color)
-            painter.setPen(QPen(gradient_color.darker(120), 2))
-            painter.drawEllipse(2, 2, icon_size-4, icon_size-4)
-            
-            # 绘制文字
-            painter.setPen(Qt.white)
-            font = QFont("Arial", 12, QFont.Bold)
-            painter.setFont(font)
-            painter.drawText(pixmap.rect(), Qt.AlignCenter, "2048")
-            
-            painter.end()
-            self.setWindowIcon(QIcon(pixmap))
+            self.setWindowIcon(_build_icon())
         except Exception:
             pass
     
     def init_ui(self):
         """初始化错误对话框界面"""
+        self.setStyleSheet(_DIALOG_CSS)
         layout = QVBoxLayout()
         
         # 错误图标和标题
         header_layout = QHBoxLayout()
         
         error_icon = QLabel("⚠️")
-        error_icon.setStyleSheet("font-size: 48px; margin-right: 10px;")
+        error_icon.setObjectName("errorIcon")
         header_layout.addWidget(error_icon)
         
         title_layout = QVBoxLayout()
         title_label = QLabel("游戏运行时遇到错误")
-        title_label.setStyleSheet("font-size: 18px; font-weight: bold; color: #d32f2f;")
+        title_label.setObjectName("errorTitle")
         subtitle_label = QLabel("请查看下面的详细信息或联系技术支持")
-        subtitle_label.setStyleSheet("color: #666;")
+        subtitle_label.setObjectName("errorSubtitle")
         
         title_layout.addWidget(title_label)
         title_layout.addWidget(subtitle_label)
@@ -80,50 +150,25 @@ class ErrorDialog(QDialog):
         self.error_text.setPlainText(self.error_info)
         self.error_text.setReadOnly(True)
         self.error_text.setFont(QFont("Consolas", 9))
-        self.error_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #f5f5f5;
-                border: 1px solid #ddd;
-                border-radius: 5px;
-                padding: 10px;
-            }
-        """)
         layout.addWidget(self.error_text)
         
         # 按钮布局
         button_layout = QHBoxLayout()
         
         copy_button = QPushButton("复制错误信息")
+        copy_button.setObjectName("copyButton")
         copy_button.clicked.connect(self.copy_error)
-        copy_button.setStyleSheet("""
-            QPushButton {
-                background-color: #2196F3;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #1976D2;
-            }
-        """)
         
         close_button = QPushButton("关闭")
+        close_button.setObjectName("closeButton")
         close_button.clicked.connect(self.accept)
-        close_button.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-        """)
+        
+        # 复制结果提示，短暂显示后自动清除
+        self._status_label = QLabel()
+        self._status_label.setObjectName("copyStatus")
         
         button_layout.addWidget(copy_button)
+        button_layout.addWidget(self._status_label)
         button_layout.addStretch()
         button_layout.addWidget(close_button)
         
@@ -134,36 +179,53 @@ class ErrorDialog(QDialog):
         """将窗口居中显示"""
         frame_geometry = self.frameGeometry()
         screen = QApplication.primaryScreen()
-        center_point = screen.availableGeometry().center()
-        frame_geometry.moveCenter(center_point)
+        _watch_screen(screen)
+        frame_geometry.moveCenter(_screen_center(screen))
         self.move(frame_geometry.topLeft())
     
     def copy_error(self):
         """复制错误信息到剪贴板"""
         clipboard = QApplication.clipboard()
         clipboard.setText(self.error_info)
-        QMessageBox.information(self, "已复制", "错误信息已复制到剪贴板！")
+        self._status_label.setText("错误信息已复制到剪贴板！")
+        QTimer.singleShot(1500, self._status_label.clear)
 
 
 class ErrorHandler:
     """全局错误处理器"""
     
     def __init__(self):
-        self.setup_logging()
+        # 日志系统在第一次发生异常时才初始化，正常运行不产生任何文件I/O
+        self.logger = None
+        self.memory_handler = None
     
     def setup_logging(self):
         """设置日志记录"""
+        if self.logger is not None:
+            return
+        
         try:
             log_dir = os.path.join(os.path.dirname(__file__), '..', 'logs')
             os.makedirs(log_dir, exist_ok=True)
             
-            log_file = os.path.join(log_dir, f'game_{datetime.now().strftime("%Y%m%d_%H%M%S")}.log')
+            log_file = os.path.join(log_dir, 'game.log')
+            
+            # 日志先缓存在内存中，攒满或遇到ERROR级别时再批量写入文件
+            self.memory_handler = logging.handlers.MemoryHandler(
+                capacity=256,
+                flushLevel=logging.ERROR,
+                target=logging.handlers.RotatingFileHandler(
+                    log_file, maxBytes=1024 * 1024, backupCount=5,
+                    encoding='utf-8', delay=True
+                )
+            )
+            atexit.register(self.memory_handler.flush)
             
             logging.basicConfig(
                 level=logging.DEBUG,
                 format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
                 handlers=[
-                    logging.FileHandler(log_file, encoding='utf-8'),
+                    self.memory_handler,
                     logging.StreamHandler()
                 ]
             )
@@ -180,32 +242,37 @@ class ErrorHandler:
             sys.__excepthook__(exc_type, exc_value, exc_traceback)
             return
         
-        # 格式化错误信息
-        error_info = """游戏运行时发生错误！
+        # 格式化错误信息（堆栈只格式化一次，对话框和日志共用）
+        formatted_tb = ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback))
+        error_info = f"""游戏运行时发生错误！
 
-错误类型：{}
-错误信息：{}
+错误类型：{exc_type.__name__}
+错误信息：{exc_value}
 
 详细堆栈：
-{}""".format(
-            exc_type.__name__,
-            str(exc_value),
-            ''.join(traceback.format_exception(exc_type, exc_value, exc_traceback))
-        )
+{formatted_tb}"""
         
         # 记录到日志文件
+        self.setup_logging()
         try:
-            self.logger.error(f"发生异常：{exc_value}", exc_info=(exc_type, exc_value, exc_traceback))
+            self.logger.error("发生异常：%s\n%s", exc_value, formatted_tb)
+            # 显示对话框前确保错误信息已写入磁盘
+            self.memory_handler.flush()
         except Exception:
             # 如果日志系统失败，回退到文件记录
             try:
-                with open("error.log", "a", encoding="utf-8") as f:
-                    f.write(f"\n{'='*50}\n")
-                    f.write(error_info)
-                    f.write(f"\n{'='*50}\n")
+                global _fallback_log
+                if _fallback_log is None:
+                    _fallback_log = open("error.log", "a", encoding="utf-8", buffering=8192)
+                _fallback_log.write(f"\n{'='*50}\n{error_info}\n{'='*50}\n")
+                _fallback_log.flush()
             except Exception:
                 pass
         
+        # 释放堆栈帧引用，避免模态对话框期间持有出错帧中的局部变量
+        exc_value.__traceback__ = None
+        exc_traceback = None
+        
         # 显示错误对话框
         app = QApplication.instance()
         if app is None:
@@ -215,8 +282,24 @@ class ErrorHandler:
         dialog.exec_()
 
 
+@functools.lru_cache(maxsize=1)
+def get_error_handler():
+    """获取全局错误处理器实例，首次调用时创建"""
+    return ErrorHandler()
+
+
+def _lazy_excepthook(exc_type, exc_value, exc_traceback):
+    """异常钩子，真正发生异常时才创建错误处理器"""
+    get_error_handler().handle_exception(exc_type, exc_value, exc_traceback)
+
+
 def install_error_handler():
-    """安装全局错误处理器"""
-    error_handler = ErrorHandler()
-    sys.excepthook = error_handler.handle_exception
-    return error_handler
\ No newline at end of file
+    """安装全局错误处理器
+    
+    只替换sys.excepthook，不创建任何对象；需要处理器实例时调用get_error_handler()。
+    
+    Returns:
+        已安装的异常钩子
+    """
+    sys.excepthook = _lazy_excepthook
+    return _lazy_excepthook
\ No newline at end of file
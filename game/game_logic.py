@@ -6,25 +6,154 @@
 """
 
 import random
-import copy
 import json
 import os
+import pickle
+import sys
+import tempfile
 from datetime import datetime
-from typing import List, Tuple, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Tuple, Optional, Dict, Any, Iterator
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """未安装numba时的占位装饰器，直接返回原函数"""
+        def decorator(func):
+            return func
+        return decorator
+
+# numba的磁盘缓存需要找到模块的.py源文件，打包后（PyInstaller）或只有.pyc时不能启用
+NUMBA_CACHE = (not getattr(sys, 'frozen', False)
+               and __file__.endswith('.py') and os.path.exists(__file__))
+
+# 特殊方块M在网格数组中的编码
+M_TILE = -1
+
+# 4×4棋盘行移动查找表：每行编码为4个4位的log2值（共16位），
+# 预先计算全部65536种行向左移动后的结果。
+# 只有0和2~2^14能编码（两个2^14合并为2^15仍可用4位表示），其他值（M、非2的幂）走逐行合并
+_TILE_TO_EXP = {0: 0, **{1 << e: e for e in range(1, 15)}}
+_EXP_TO_TILE = [0] + [1 << e for e in range(1, 16)]
+
+
+@lru_cache(maxsize=1)
+def _build_row_tables() -> Tuple[List[int], List[bool]]:
+    """构建行移动查找表，首次查表时才构建（约0.1秒），安装numba时不会用到
+
+    Returns:
+        (移动后的行编码, 该行合并是否产生2048)，转换为Python列表，按下标取值比numpy标量索引快
+    """
+    left = np.zeros(65536, dtype=np.uint16)
+    won = np.zeros(65536, dtype=bool)
+    for key in range(65536):
+        tiles = [e for e in (key & 0xF, key >> 4 & 0xF, key >> 8 & 0xF, key >> 12) if e]
+        result = 0
+        shift = 0
+        i = 0
+        while i < len(tiles):
+            e = tiles[i]
+            if i + 1 < len(tiles) and tiles[i + 1] == e:
+                e += 1
+                if e == 11:  # 2^11 = 2048
+                    won[key] = True
+                i += 2
+            else:
+                i += 1
+            result |= e << shift
+            shift += 4
+        left[key] = result & 0xFFFF
+    return left.tolist(), won.tolist()
+
+# 存档格式：{名称}__{时间}__{版本}.pkl
+# 存档用pickle读写，只应加载本机游戏自己写入的存档，不要放入来源不明的文件
+SAVE_VERSION = '2.1.0'
+SAVE_EXT = '.pkl'
+LEGACY_SAVE_EXT = '.json'  # 旧版JSON存档，仍可列出和加载
+SAVE_TIME_FORMAT = '%Y%m%d-%H%M%S'
+HIGH_SCORE_FILE = 'highscore'
+
+
+def _parse_save_filename(filename: str) -> Optional[Dict[str, str]]:
+    """从存档文件名中解析名称、时间和版本，不是存档文件时返回None"""
+    if not filename.endswith(SAVE_EXT):
+        return None
+    parts = filename[:-len(SAVE_EXT)].rsplit('__', 2)
+    if len(parts) != 3:
+        return None
+    name, stamp, version = parts
+    try:
+        date = datetime.strptime(stamp, SAVE_TIME_FORMAT).strftime('%Y-%m-%d %H:%M:%S')
+    except ValueError:
+        return None
+    return {'name': name, 'date': date, 'version': version}
+
+
+@njit(cache=NUMBA_CACHE)
+def _merge_rows_left(grid, out):
+    """将grid的每一行向左压缩合并，结果写入全零的out
+    
+    安装numba时编译为机器码，否则按普通Python函数执行。
+    
+    Returns:
+        (是否合并出2048, 是否发生M合并)
+    """
+    won = False
+    special_merged = False
+    
+    for r in range(grid.shape[0]):
+        row = grid[r]
+        # 压缩非零方块（包括特殊方块M）
+        tiles = row[row != 0]
+        n = len(tiles)
+        
+        # 合并相同的数字
+        k = 0
+        i = 0
+        while i < n:
+            if i + 1 < n and tiles[i] == tiles[i + 1] and tiles[i] != M_TILE:
+                merged_value = tiles[i] * 2
+                out[r, k] = merged_value
+                if merged_value == 2048:
+                    won = True
+                i += 2
+            elif tiles[i] == M_TILE and i + 1 < n and tiles[i + 1] == M_TILE:
+                # 两个M结合，消除附近方块
+                out[r, k] = 0  # 消除M
+                special_merged = True
+                i += 2
+            else:
+                out[r, k] = tiles[i]
+                i += 1
+            k += 1
+    
+    return won, special_merged
 
 class Game2048:
     """2048游戏核心逻辑类"""
     
-    def __init__(self, size: int = 4):
+    def __init__(self, size: int = 4, persist_high_score: bool = False):
         """初始化游戏
         
         Args:
             size: 游戏网格大小，默认为4
+            persist_high_score: 是否从磁盘读取并写回历史最高分（仅本地游戏窗口启用，
+                网页端每局都是独立的，不读写本地记录）
         """
         self.size = size
-        self.grid = [[0 for _ in range(size)] for _ in range(size)]
+        self.grid = np.zeros((size, size), dtype=np.int32)
+        # 空单元格位置缓存，随网格变化增量更新；列表用于随机下标抽取，字典记录下标以便O(1)删除
+        self._empty_cells = []
+        self._empty_index = {}
+        self._reset_empty_cells()
+        self._rand = random.random
         self.score = 0
-        self.high_score = 0
         self.moves = 0
         self.game_over = False
         self.won = False
@@ -34,6 +163,12 @@ class Game2048:
         # 确保保存目录存在
         if not os.path.exists(self.save_dir):
             os.makedirs(self.save_dir)
+        
+        # 读取历史最高分，之后只在最高分增长时写回
+        self.persist_high_score = persist_high_score
+        self.high_score = self._saved_high_score = (
+            self._load_high_score() if persist_high_score else 0
+        )
             
         # 初始化游戏
         self.add_new_tile()
@@ -42,80 +177,91 @@ class Game2048:
     
     def add_new_tile(self) -> bool:
         """添加新的数字方块"""
-        empty_cells = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == 0:
-                    empty_cells.append((i, j))
-        
-        if not empty_cells:
+        if not self._empty_cells:
             # 检查是否真的无法移动
             if self.is_game_over():
                 self.game_over = True
             return False
         
-        row, col = random.choice(empty_cells)
+        empty_cells = self._empty_cells
+        row, col = empty_cells[random.randrange(len(empty_cells))]
         
         # 新方块生成概率：2(90%)、4(10%)
-        rand = random.random()
-        if rand < 0.9:
-            value = 2
-        else:
-            value = 4
+        value = 2 if self._rand() < 0.9 else 4
             
-        self.grid[row][col] = value
+        self.grid[row, col] = value
+        self._discard_empty_cell((row, col))
+        self.score += value
         
         return True
     
+    def _reset_empty_cells(self) -> None:
+        """完整扫描网格重建空单元格缓存"""
+        self._empty_cells = list(map(tuple, np.argwhere(self.grid == 0).tolist()))
+        self._empty_index = {cell: i for i, cell in enumerate(self._empty_cells)}
+    
+    def _add_empty_cell(self, cell: Tuple[int, int]) -> None:
+        """记录新出现的空单元格"""
+        if cell not in self._empty_index:
+            self._empty_index[cell] = len(self._empty_cells)
+            self._empty_cells.append(cell)
+    
+    def _discard_empty_cell(self, cell: Tuple[int, int]) -> None:
+        """移除不再为空的单元格，用末尾元素填补空位"""
+        idx = self._empty_index.pop(cell, None)
+        if idx is None:
+            return
+        last = self._empty_cells.pop()
+        if idx < len(self._empty_cells):
+            self._empty_cells[idx] = last
+            self._empty_index[last] = idx
+    
+    def _update_empty_cells(self, was_empty: np.ndarray) -> None:
+        """根据变化前的空格掩码，只更新状态发生变化的单元格"""
+        is_empty = self.grid == 0
+        for i, j in np.argwhere(was_empty != is_empty).tolist():
+            if is_empty[i, j]:
+                self._add_empty_cell((i, j))
+            else:
+                self._discard_empty_cell((i, j))
+    
     def move_left(self) -> bool:
         """向左移动
         
         Returns:
             是否有方块移动或合并
         """
-        moved = False
-        new_grid = []
-        special_merged = False
+        return self._slide(self.grid)
+    
+    def _slide(self, view: np.ndarray) -> bool:
+        """沿视图的行方向向左压缩合并，结果直接写回self.grid
         
-        for row in self.grid:
-            # 处理特殊方块M
-            new_row = []
-            for val in row:
-                if val != 0 and val != 'M':
-                    new_row.append(val)
-                elif val == 'M':
-                    new_row.append('M')
-            
-            # 合并相同的数字
-            merged = []
-            i = 0
-            while i < len(new_row):
-                if i + 1 < len(new_row) and new_row[i] == new_row[i + 1] and new_row[i] != 'M':
-                    merged_value = new_row[i] * 2
-                    merged.append(merged_value)
-                    if merged_value == 2048 and not self.won:
-                        self.won = True
-                    i += 2
-                elif new_row[i] == 'M' and i + 1 < len(new_row) and new_row[i + 1] == 'M':
-                    # 两个M结合，消除附近方块
-                    merged.append(0)  # 消除M
-                    special_merged = True
-                    i += 2
-                else:
-                    merged.append(new_row[i])
-                    i += 1
-            
-            # 填充零
-            merged.extend([0] * (self.size - len(merged)))
-            new_grid.append(merged)
+        Args:
+            view: self.grid的零拷贝视图（翻转/转置后的方向）
             
-            if merged != row:
-                moved = True
+        Returns:
+            是否有方块移动或合并
+        """
+        special_merged = False
+        new_rows = None
+        
+        # numba编译后的逐行合并比查表更快（见performance_test.py的移动基准），
+        # 只在未安装numba时对4×4棋盘查表，无法编码的棋盘仍回退到逐行合并
+        if self.size == 4 and not NUMBA_AVAILABLE:
+            new_rows = self._move_left_by_table(view)
+        if new_rows is None:
+            new_rows, special_merged = self._move_left_by_rows(view)
+        
+        moved = not np.array_equal(new_rows, view)
         
         if moved or special_merged:
             if special_merged:
                 self.clear_surrounding_tiles()
-            self.grid = new_grid
+                # 写回会覆盖被清除的位置，按写回前后的差值修正分数
+                self.score += int(new_rows[new_rows > 0].sum()) - int(view[view > 0].sum())
+            was_empty = self.grid == 0
+            view[...] = new_rows
+            self._update_empty_cells(was_empty)
             self.moves += 1
             self.add_new_tile()
             self.update_score()  # 更新分数
@@ -123,34 +269,75 @@ class Game2048:
         
         return moved or special_merged
     
+    def _move_left_by_table(self, view: np.ndarray) -> Optional[np.ndarray]:
+        """通过行移动查找表计算4×4网格向左移动后的结果
+        
+        Returns:
+            移动后的网格；存在无法用4位编码的方块时返回None
+        """
+        to_exp = _TILE_TO_EXP
+        try:
+            keys = [to_exp[a] | to_exp[b] << 4 | to_exp[c] << 8 | to_exp[d] << 12
+                    for a, b, c, d in view.tolist()]
+        except KeyError:
+            return None
+        
+        left_table, won_table = _build_row_tables()
+        if not self.won and any(won_table[key] for key in keys):
+            self.won = True
+        
+        to_tile = _EXP_TO_TILE
+        rows = []
+        for key in keys:
+            row = left_table[key]
+            rows.append((to_tile[row & 0xF], to_tile[row >> 4 & 0xF],
+                         to_tile[row >> 8 & 0xF], to_tile[row >> 12]))
+        return np.array(rows, dtype=np.int32)
+    
+    def _move_left_by_rows(self, view: np.ndarray) -> Tuple[np.ndarray, bool]:
+        """逐行压缩合并，支持任意大小网格和特殊方块M
+        
+        Returns:
+            (移动后的网格, 是否发生了M合并)
+        """
+        new_grid = np.zeros_like(view)
+        won, special_merged = _merge_rows_left(view, new_grid)
+        if won and not self.won:
+            self.won = True
+        return new_grid, bool(special_merged)
+    
     def move_right(self) -> bool:
         """向右移动"""
-        # 反转每一行，然后向左移动，再反转回来
-        reversed_grid = [row[::-1] for row in self.grid]
-        self.grid = reversed_grid
-        moved = self.move_left()
-        self.grid = [row[::-1] for row in self.grid]
-        return moved
+        # 左右翻转的视图上向左移动
+        return self._slide(self.grid[:, ::-1])
     
     def move_up(self) -> bool:
         """向上移动"""
-        # 转置矩阵，向左移动，再转置回来
-        transposed = [list(row) for row in zip(*self.grid)]
-        self.grid = transposed
-        moved = self.move_left()
-        self.grid = [list(row) for row in zip(*self.grid)]
-        return moved
+        # 转置视图上向左移动
+        return self._slide(self.grid.T)
     
     def move_down(self) -> bool:
         """向下移动"""
-        # 转置矩阵，向右移动，再转置回来
-        transposed = [list(row) for row in zip(*self.grid)]
-        reversed_transposed = [row[::-1] for row in transposed]
-        self.grid = reversed_transposed
-        moved = self.move_left()
-        self.grid = [row[::-1] for row in self.grid]
-        self.grid = [list(row) for row in zip(*self.grid)]
-        return moved
+        # 转置后再左右翻转的视图上向左移动
+        return self._slide(self.grid.T[:, ::-1])
+    
+    def _has_legal_move(self) -> bool:
+        """只读检查当前网格是否还存在合法移动"""
+        if self._empty_cells:
+            return True
+        
+        grid = self.grid
+        # 特殊方块M可以继续游戏
+        if (grid == M_TILE).any():
+            return True
+        
+        # 检查是否有可以合并的相邻方块（水平和垂直）
+        if (grid[:, :-1] == grid[:, 1:]).any():
+            return True
+        if (grid[:-1, :] == grid[1:, :]).any():
+            return True
+        
+        return False
     
     def is_game_over(self) -> bool:
         """检查游戏是否结束
@@ -158,56 +345,54 @@ class Game2048:
         Returns:
             True如果游戏结束，False否则
         """
-        # 检查是否有空格
-        for row in self.grid:
-            if 0 in row:
-                return False
-            if 'M' in row:
-                return False  # 特殊方块M可以继续游戏
-        
-        # 检查是否有可以合并的相邻方块
-        for i in range(self.size):
-            for j in range(self.size):
-                current = self.grid[i][j]
-                # 检查右边
-                if j + 1 < self.size and self.grid[i][j + 1] == current:
-                    return False
-                # 检查下面
-                if i + 1 < self.size and self.grid[i + 1][j] == current:
-                    return False
-                # 检查特殊方块M
-                if current == 'M':
-                    # 检查是否有另一个M相邻
-                    for dr, dc in [(-1,0), (1,0), (0,-1), (0,1)]:
-                        ni, nj = i + dr, j + dc
-                        if 0 <= ni < self.size and 0 <= nj < self.size and self.grid[ni][nj] == 'M':
-                            return False
-        
-        return True
+        return not self._has_legal_move()
     
     def can_move(self) -> bool:
         """检查是否可以移动"""
-        if not self.is_game_over():
-            return True
-        
-        # 创建临时游戏状态检查是否可以移动
-        temp_game = copy.deepcopy(self)
-        return (temp_game.move_left() or 
-                temp_game.move_right() or 
-                temp_game.move_up() or 
-                temp_game.move_down())
+        return self._has_legal_move()
     
     def check_game_over(self) -> bool:
         """检查并设置游戏结束状态"""
         if self.is_game_over():
             self.game_over = True
+            self._save_high_score()
             return True
         return False
     
-    def get_state(self) -> Dict[str, Any]:
-        """获取游戏状态"""
+    def _load_high_score(self) -> int:
+        """从磁盘读取历史最高分"""
+        try:
+            with open(os.path.join(self.save_dir, HIGH_SCORE_FILE), 'r', encoding='utf-8') as f:
+                return int(f.read() or 0)
+        except (OSError, ValueError):
+            return 0
+    
+    def _save_high_score(self) -> None:
+        """最高分超过已保存的值时原子写回磁盘"""
+        if not self.persist_high_score or self.high_score <= self._saved_high_score:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.save_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(str(self.high_score))
+            os.replace(tmp_path, os.path.join(self.save_dir, HIGH_SCORE_FILE))
+            self._saved_high_score = self.high_score
+        except OSError as e:
+            print(f"保存最高分失败: {e}")
+    
+    def get_state(self, raw_grid: bool = False) -> Dict[str, Any]:
+        """获取游戏状态
+        
+        Args:
+            raw_grid: 为True且网格中没有特殊方块时，grid返回numpy数组副本，
+                供orjson(OPT_SERIALIZE_NUMPY)序列化，省去转换成嵌套列表的开销
+        """
+        if raw_grid and not (self.grid == M_TILE).any():
+            grid = self._clone_grid()
+        else:
+            grid = self.get_grid()
         return {
-            'grid': self.grid,
+            'grid': grid,
             'score': self.score,
             'high_score': self.high_score,
             'moves': self.moves,
@@ -219,7 +404,8 @@ class Game2048:
     
     def set_state(self, state: Dict[str, Any]) -> None:
         """设置游戏状态"""
-        self.grid = state['grid']
+        self.grid = self._grid_from_list(state['grid'])
+        self._reset_empty_cells()
         self.score = state['score']
         self.high_score = max(self.high_score, state.get('high_score', 0))
         self.moves = state['moves']
@@ -229,7 +415,9 @@ class Game2048:
     
     def reset(self) -> None:
         """重置游戏"""
-        self.grid = [[0 for _ in range(self.size)] for _ in range(self.size)]
+        self._save_high_score()
+        self.grid = np.zeros((self.size, self.size), dtype=np.int32)
+        self._reset_empty_cells()
         self.score = 0
         self.moves = 0
         self.game_over = False
@@ -239,19 +427,43 @@ class Game2048:
         self.add_new_tile()
         self.update_score()  # 重置后更新分数
     
-    def save_game(self, save_name: str = "auto_save") -> bool:
-        """保存游戏"""
+    def save_game(self, save_name: str = "auto_save", export_json: bool = False) -> bool:
+        """保存游戏
+        
+        Args:
+            save_name: 保存名称
+            export_json: 是否额外导出一份可读的JSON文件，便于调试
+        """
         try:
+            now = datetime.now()
             save_data = {
-                'timestamp': datetime.now().isoformat(),
-                'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'timestamp': now.isoformat(),
+                'date': now.strftime('%Y-%m-%d %H:%M:%S'),
                 'game_state': self.get_state(),
-                'version': '2.1.0'
+                'version': SAVE_VERSION
             }
             
-            save_path = os.path.join(self.save_dir, f"{save_name}.json")
-            with open(save_path, 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            # 时间和版本写入文件名，列出存档时无需打开文件
+            old_paths = [path for path, _ in self._find_saves(save_name)]
+            save_path = os.path.join(
+                self.save_dir,
+                f"{save_name}__{now.strftime(SAVE_TIME_FORMAT)}__{SAVE_VERSION}{SAVE_EXT}"
+            )
+            
+            # 先写临时文件再原子替换，避免崩溃时留下损坏的存档
+            tmp_path = save_path + ".tmp"
+            with open(tmp_path, 'wb', buffering=65536) as f:
+                pickle.dump(save_data, f, protocol=5)
+            os.replace(tmp_path, save_path)
+            
+            for path in old_paths:
+                if path != save_path:
+                    os.remove(path)
+            
+            if export_json:
+                json_path = os.path.join(self.save_dir, f"{save_name}{LEGACY_SAVE_EXT}")
+                with open(json_path, 'w', encoding='utf-8') as f:
+                    json.dump(save_data, f, ensure_ascii=False, indent=2)
             
             return True
             
@@ -260,14 +472,25 @@ class Game2048:
             return False
     
     def load_game(self, save_name: str = "auto_save") -> bool:
-        """加载游戏"""
+        """加载游戏
+        
+        .pkl存档用pickle.load读取，存档目录中的文件视为本机写入的可信数据；
+        外部导入的存档请使用JSON格式
+        """
         try:
-            save_path = os.path.join(self.save_dir, f"{save_name}.json")
-            if not os.path.exists(save_path):
-                return False
-                
-            with open(save_path, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
+            saves = self._find_saves(save_name)
+            if saves:
+                # 同名存档取最新的一份
+                save_path = max(saves, key=lambda item: item[1]['date'])[0]
+                with open(save_path, 'rb') as f:
+                    save_data = pickle.load(f)
+            else:
+                # 兼容旧版JSON存档
+                save_path = os.path.join(self.save_dir, f"{save_name}{LEGACY_SAVE_EXT}")
+                if not os.path.exists(save_path):
+                    return False
+                with open(save_path, 'r', encoding='utf-8') as f:
+                    save_data = json.load(f)
                 
             game_state = save_data.get('game_state')
             if game_state:
@@ -279,31 +502,61 @@ class Game2048:
         return False
     
     def list_saves(self) -> list:
-        """列出所有保存的游戏"""
+        """列出所有保存的游戏，包括旧版JSON存档"""
         saves = []
+        legacy = []
         try:
-            for filename in os.listdir(self.save_dir):
-                if filename.endswith('.json'):
-                    save_name = filename[:-5]
-                    save_path = os.path.join(self.save_dir, filename)
-                    
-                    try:
-                        with open(save_path, 'r', encoding='utf-8') as f:
-                            save_data = json.load(f)
-                            
-                        saves.append({
-                            'name': save_name,
-                            'date': save_data.get('date', '未知时间'),
-                            'version': save_data.get('version', '未知版本')
-                        })
-                    except:
-                        continue
+            with os.scandir(self.save_dir) as entries:
+                for entry in entries:
+                    info = _parse_save_filename(entry.name)
+                    if info:
+                        saves.append(info)
+                    elif entry.name.endswith(LEGACY_SAVE_EXT):
+                        legacy.append(entry)
+            
+            # 有同名新存档时load_game读取新存档，同名的JSON（如export_json导出的文件）不再列出
+            names = {info['name'] for info in saves}
+            for entry in legacy:
+                name = entry.name[:-len(LEGACY_SAVE_EXT)]
+                if name not in names:
+                    info = self._read_legacy_save_info(entry, name)
+                    if info:
+                        saves.append(info)
                         
         except Exception as e:
             print(f"列出保存文件失败: {e}")
             
         return sorted(saves, key=lambda x: x['date'], reverse=True)
     
+    @staticmethod
+    def _read_legacy_save_info(entry: os.DirEntry, name: str) -> Optional[Dict[str, str]]:
+        """读取旧版JSON存档的时间和版本，不是游戏存档时返回None"""
+        try:
+            with open(entry.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or 'game_state' not in data:
+            return None
+        date = data.get('date') or datetime.fromtimestamp(entry.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+        return {'name': name, 'date': date, 'version': data.get('version', '未知版本')}
+    
+    def _find_saves(self, save_name: str) -> List[Tuple[str, Dict[str, str]]]:
+        """查找指定名称的存档文件
+        
+        Returns:
+            (文件路径, 存档信息) 列表
+        """
+        found = []
+        if not os.path.isdir(self.save_dir):
+            return found
+        with os.scandir(self.save_dir) as entries:
+            for entry in entries:
+                info = _parse_save_filename(entry.name)
+                if info and info['name'] == save_name:
+                    found.append((entry.path, info))
+        return found
+    
     def check_auto_save(self) -> bool:
         """检查是否应该自动保存"""
         max_tile = self.get_max_tile()
@@ -311,59 +564,67 @@ class Game2048:
     
     def get_empty_cells(self) -> List[Tuple[int, int]]:
         """获取空单元格位置"""
-        empty_cells = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == 0:
-                    empty_cells.append((i, j))
-        return empty_cells
+        return sorted(self._empty_cells)
+    
+    def get_grid(self) -> List[List[Any]]:
+        """获取列表形式的网格，特殊方块还原为'M'，用于显示和序列化"""
+        return self._grid_to_list(self.grid)
+    
+    def _clone_grid(self) -> np.ndarray:
+        """复制当前网格"""
+        return self.grid.copy()
+    
+    @staticmethod
+    def _grid_to_list(grid: np.ndarray) -> List[List[Any]]:
+        """将网格数组转换为列表，M_TILE还原为'M'"""
+        rows = grid.tolist()
+        if (grid == M_TILE).any():
+            rows = [['M' if val == M_TILE else val for val in row] for row in rows]
+        return rows
+    
+    @staticmethod
+    def _grid_from_list(grid: List[List[Any]]) -> np.ndarray:
+        """将列表形式的网格转换为数组，'M'编码为M_TILE"""
+        return np.array([[M_TILE if val == 'M' else val for val in row] for row in grid],
+                        dtype=np.int32)
     
     def get_max_tile(self) -> int:
         """获取最大方块值"""
-        try:
-            return max(max(val for val in row if isinstance(val, int)) for row in self.grid if any(isinstance(val, int) for val in row))
-        except ValueError:
-            return 0
+        return int(self.grid.max(initial=0))
     
     def calculate_total_score(self) -> int:
         """计算网格内所有数字的总和作为分数"""
-        total = 0
-        for row in self.grid:
-            for val in row:
-                if isinstance(val, int) and val > 0:
-                    total += val
-        return total
+        return int(self.grid[self.grid > 0].sum())
     
     def clear_surrounding_tiles(self) -> None:
         """清除特殊方块周围的方块"""
         # 找到所有M的位置
-        m_positions = []
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.grid[i][j] == 'M':
-                    m_positions.append((i, j))
-        
-        # 清除每个M周围的方块
-        for row, col in m_positions:
-            for dr in [-1, 0, 1]:
-                for dc in [-1, 0, 1]:
-                    new_row, new_col = row + dr, col + dc
-                    if 0 <= new_row < self.size and 0 <= new_col < self.size:
-                        if isinstance(self.grid[new_row][new_col], int):
-                            self.score += self.grid[new_row][new_col]  # 加分
-                        self.grid[new_row][new_col] = 0
-    
-    def get_animated_moves(self, direction: str) -> list:
+        m_positions = np.argwhere(self.grid == M_TILE)
+        
+        # 清除每个M周围3×3区域（边界处截断）的方块
+        for row, col in m_positions.tolist():
+            r0, r1 = max(0, row - 1), min(self.size, row + 2)
+            c0, c1 = max(0, col - 1), min(self.size, col + 2)
+            region = self.grid[r0:r1, c0:c1]
+            self.score -= int(region[region > 0].sum())  # 移除方块同步扣减
+            region[:] = 0
+            for i in range(r0, r1):
+                for j in range(c0, c1):
+                    self._add_empty_cell((i, j))
+    
+    def get_animated_moves(self, direction: str) -> Iterator[Dict[str, Any]]:
         """获取带有动画的移动序列
         
+        生成器在开始迭代时才执行移动，每帧的网格为不可变的元组快照，
+        调用方需要修改时自行复制。
+        
         Args:
             direction: 移动方向 ('left', 'right', 'up', 'down')
             
-        Returns:
-            动画帧列表，每帧包含网格状态
+        Yields:
+            动画帧，每帧包含网格状态
         """
-        frames = []
-        original_grid = [row[:] for row in self.grid]
+        original_grid = tuple(map(tuple, self._grid_to_list(self._clone_grid())))
         
         # 根据方向执行移动
         if direction == 'left':
@@ -376,30 +637,33 @@ class Game2048:
             self.move_down()
         
         # 添加动画帧（简化版本）
-        frames.append({
+        yield {
             'grid': original_grid,
             'score': self.score,
             'moves': self.moves
-        })
+        }
         
-        frames.append({
-            'grid': [row[:] for row in self.grid],
+        yield {
+            'grid': tuple(map(tuple, self.get_grid())),
             'score': self.score,
             'moves': self.moves
-        })
-        
-        return frames
+        }
     
     def update_score(self) -> None:
-        """更新分数为网格内所有数字的总和"""
-        self.score = self.calculate_total_score()
+        """同步最高分
+        
+        分数即网格内所有数字的总和，已在生成和清除方块时增量维护
+        （合并不改变总和），这里不再重新扫描网格。
+        """
         if self.score > self.high_score:
             self.high_score = self.score
+            self._save_high_score()
 
     def __str__(self) -> str:
         """字符串表示"""
         lines = []
-        for row in self.grid:
-            line = ' '.join(f'{num:4d}' if num != 0 else '   .' for num in row)
+        for row in self.grid.tolist():
+            line = ' '.join(f'{num:4d}' if num > 0 else ('   M' if num == M_TILE else '   .')
+                            for num in row)
             lines.append(line)
         return '\n'.join(lines)
\ No newline at end of file
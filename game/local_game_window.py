@@ -6,14 +6,16 @@
 """
 
 import sys
+from datetime import datetime
 from typing import List
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QHBoxLayout, QPushButton, QLabel, QGridLayout, 
+                             QHBoxLayout, QPushButton, QLabel, 
                              QMessageBox, QComboBox, QFrame, QDialog, QTextEdit)
-from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread
-from PyQt5.QtGui import QFont, QPainter, QColor, QPen, QKeyEvent, QIcon, QPixmap
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QThread, QRectF
+from PyQt5.QtGui import QFont, QPainter, QColor, QPen, QKeyEvent, QIcon, QPixmap, QPixmapCache
 
 from game.game_logic import Game2048
+from game.save_manager import leaderboard_cache
 try:
     from game.server_manager import ServerManager, FLASK_AVAILABLE
 except ImportError:
@@ -21,130 +23,161 @@ except ImportError:
     FLASK_AVAILABLE = False
 from utils.config import GameConfig
 
-class GameTile(QLabel):
-    """游戏方块组件"""
+# SW窗口图标缓存，首次使用时绘制
+_ICON_CACHE = None
+
+def _get_sw_icon() -> QIcon:
+    """获取SW主题窗口图标，只绘制一次"""
+    global _ICON_CACHE
+    if _ICON_CACHE is None:
+        icon_size = 64
+        pixmap = QPixmap(icon_size, icon_size)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        
+        # 绘制SW橙色渐变背景
+        painter.setBrush(QColor(255, 107, 53))  # SW橙色
+        painter.setPen(Qt.NoPen)
+        painter.drawRoundedRect(pixmap.rect().adjusted(4, 4, -4, -4), 8, 8)
+        
+        # 绘制白色"SW"
+        painter.setPen(Qt.white)
+        font = QFont("Arial", 18, QFont.Bold)
+        painter.setFont(font)
+        painter.drawText(pixmap.rect(), Qt.AlignCenter, "SW")
+        
+        painter.end()
+        
+        _ICON_CACHE = QIcon(pixmap)
+    return _ICON_CACHE
+
+class GameGrid(QWidget):
+    """游戏网格组件，在一次paintEvent中绘制所有方块"""
     
-    def __init__(self, value: int = 0, parent=None):
-        super().__init__(parent)
-        self.value = value
-        self.setAlignment(Qt.AlignCenter)
-        self.setMinimumSize(60, 60)
-        self.setMaximumSize(60, 60)
-        self.update_style()
+    TILE_SIZE = 60   # 方块边长
+    SPACING = 5      # 方块间距
+    MARGIN = 9       # 网格边距
     
-    def update_style(self):
-        """更新方块样式"""
-        if self.value == 0:
-            self.setText("")
-            self.setStyleSheet("""
-                QLabel {
-                    background-color: #cdc1b4;
-                    border: 1px solid #bbada0;
-                    border-radius: 3px;
-                    font-size: 18px;
-                    font-weight: bold;
-                }
-            """)
-        else:
-            self.setText(str(self.value))
-            
-            # 根据数值选择颜色
-            colors = {
-                2: ("#eee4da", "#776e65"),
-                4: ("#ede0c8", "#776e65"),
-                8: ("#f2b179", "#f9f6f2"),
-                16: ("#f59563", "#f9f6f2"),
-                32: ("#f67c5f", "#f9f6f2"),
-                64: ("#f65e3b", "#f9f6f2"),
-                128: ("#edcf72", "#f9f6f2"),
-                256: ("#edcc61", "#f9f6f2"),
-                512: ("#edc850", "#f9f6f2"),
-                1024: ("#edc53f", "#f9f6f2"),
-                2048: ("#edc22e", "#f9f6f2")
-            }
-            
-            bg_color, text_color = colors.get(self.value, ("#3c3a32", "#f9f6f2"))
-            
-            # 根据数值大小调整字体大小和样式
-            value = str(self.value)
-            if value == 'M':
-                font_size = 20  # 更大的字体
-                bg_color = "#ff4757"  # 鲜艳的红色背景，更醒目
-                text_color = "#ffffff"  # 白色文字
-                border_color = "#ff3742"  # 边框颜色
-            elif isinstance(self.value, int):
-                if self.value >= 1000:
-                    font_size = 14
-                elif self.value >= 100:
-                    font_size = 16
-                else:
-                    font_size = 18
-            else:
-                font_size = 18
-            
-            self.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {bg_color};
-                    color: {text_color};
-                    border: 1px solid #bbada0;
-                    border-radius: 3px;
-                    font-size: {font_size}px;
-                    font-weight: bold;
-                }}
-            """)
+    # 根据数值选择颜色
+    COLORS = {
+        2: ("#eee4da", "#776e65"),
+        4: ("#ede0c8", "#776e65"),
+        8: ("#f2b179", "#f9f6f2"),
+        16: ("#f59563", "#f9f6f2"),
+        32: ("#f67c5f", "#f9f6f2"),
+        64: ("#f65e3b", "#f9f6f2"),
+        128: ("#edcf72", "#f9f6f2"),
+        256: ("#edcc61", "#f9f6f2"),
+        512: ("#edc850", "#f9f6f2"),
+        1024: ("#edc53f", "#f9f6f2"),
+        2048: ("#edc22e", "#f9f6f2")
+    }
     
-    def set_value(self, value: int):
-        """设置方块值"""
-        self.value = value
-        self.update_style()
-
-class GameGrid(QWidget):
-    """游戏网格组件"""
+    # 方块图像存放在QPixmapCache中，整个进程内所有网格共用
+    PIXMAP_CACHE_LIMIT = 4096  # KB
+    _cache_ready = False
     
     def __init__(self, size: int = 4, parent=None):
         super().__init__(parent)
+        if not GameGrid._cache_ready:
+            QPixmapCache.setCacheLimit(self.PIXMAP_CACHE_LIMIT)
+            GameGrid._build_tile_pixmaps()
+            GameGrid._cache_ready = True
         self.size = size
-        self.tiles = []
-        self.init_ui()
+        self._grid = [[0] * size for _ in range(size)]
+        self._update_fixed_size()
     
-    def init_ui(self):
-        """初始化UI"""
-        layout = QGridLayout()
-        layout.setSpacing(5)
-        
-        self.tiles = []
-        for i in range(self.size):
-            row = []
-            for j in range(self.size):
-                tile = GameTile(0)
-                layout.addWidget(tile, i, j)
-                row.append(tile)
-            self.tiles.append(row)
-        
-        self.setLayout(layout)
+    @classmethod
+    def _build_tile_pixmaps(cls):
+        """预先渲染空方块、2~2048以及特殊方块M"""
+        for value in [0, 'M'] + list(cls.COLORS):
+            QPixmapCache.insert(cls._cache_key(value), cls._render_tile(value))
+    
+    @classmethod
+    def _cache_key(cls, value) -> str:
+        """方块图像在QPixmapCache中的键"""
+        return f"tile:{value}:{cls.TILE_SIZE}"
+    
+    @classmethod
+    def _render_tile(cls, value) -> QPixmap:
+        """渲染指定方块值的图像"""
+        if value == 0:
+            bg_color, text_color, font_size = "#cdc1b4", "#776e65", 18
+        elif value == 'M':
+            # 鲜艳的红色背景和更大的字体，更醒目
+            bg_color, text_color, font_size = "#ff4757", "#ffffff", 20
+        else:
+            bg_color, text_color = cls.COLORS.get(value, ("#3c3a32", "#f9f6f2"))
+            # 根据数值大小调整字体大小
+            if value >= 1000:
+                font_size = 14
+            elif value >= 100:
+                font_size = 16
+            else:
+                font_size = 18
+        
+        pixmap = QPixmap(cls.TILE_SIZE, cls.TILE_SIZE)
+        pixmap.fill(Qt.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor("#bbada0"), 1))
+        painter.setBrush(QColor(bg_color))
+        painter.drawRoundedRect(QRectF(pixmap.rect()).adjusted(0.5, 0.5, -0.5, -0.5), 3, 3)
+        
+        if value != 0:
+            font = QFont()
+            font.setPixelSize(font_size)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(QColor(text_color))
+            painter.drawText(pixmap.rect(), Qt.AlignCenter, str(value))
+        
+        painter.end()
+        return pixmap
+    
+    def _tile_pixmap(self, value) -> QPixmap:
+        """获取方块图像，超过2048或已被缓存淘汰的方块按需渲染"""
+        key = self._cache_key(value)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None or pixmap.isNull():
+            pixmap = self._render_tile(value)
+            QPixmapCache.insert(key, pixmap)
+        return pixmap
+    
+    def _update_fixed_size(self):
+        """按网格大小设置控件尺寸"""
+        side = 2 * self.MARGIN + self.size * self.TILE_SIZE + (self.size - 1) * self.SPACING
+        self.setFixedSize(side, side)
     
     def update_grid(self, grid: List[List[int]]):
-        """更新网格显示"""
-        for i in range(self.size):
-            for j in range(self.size):
-                self.tiles[i][j].set_value(grid[i][j])
+        """更新网格显示，网格未变化时不重绘"""
+        if grid == self._grid:
+            return
+        self._grid = grid
+        self.update()
     
     def resize_grid(self, new_size: int):
         """调整网格大小"""
         self.size = new_size
-        
-        # 清除旧布局
-        if self.layout():
-            old_layout = self.layout()
-            for i in reversed(range(old_layout.count())):
-                widget = old_layout.itemAt(i).widget()
-                if widget:
-                    widget.setParent(None)
-            import sip
-            sip.delete(old_layout)
-        
-        # 重新创建网格
-        self.init_ui()
+        self._grid = [[0] * new_size for _ in range(new_size)]
+        self._update_fixed_size()
+        self.update()
+    
+    def paintEvent(self, event):
+        """绘制整个网格"""
+        painter = QPainter(self)
+        step = self.TILE_SIZE + self.SPACING
+        y = self.MARGIN
+        for row in self._grid:
+            x = self.MARGIN
+            for value in row:
+                painter.drawPixmap(x, y, self._tile_pixmap(value))
+                x += step
+            y += step
+        painter.end()
 
 class LocalGameWindow(QMainWindow):
     """本地游戏主窗口"""
@@ -152,9 +185,11 @@ class LocalGameWindow(QMainWindow):
     def __init__(self, config: GameConfig):
         super().__init__()
         self.config = config
-        self.game = Game2048(4)
+        self.game = Game2048(4, persist_high_score=True)
+        self.game._won_shown = False  # 胜利对话框每局只显示一次
         self.server_manager = None
         self.server_thread = None
+        self._refresh_pending = False  # 是否已安排刷新显示
         
         # 初始化UI后再处理Flask相关设置
         
@@ -173,28 +208,7 @@ class LocalGameWindow(QMainWindow):
     
     def setup_window_icon(self):
         """设置窗口图标 - SW主题"""
-        icon_size = 64
-        pixmap = QPixmap(icon_size, icon_size)
-        pixmap.fill(Qt.transparent)
-        
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # 绘制SW橙色渐变背景
-        from PyQt5.QtGui import QColor
-        painter.setBrush(QColor(255, 107, 53))  # SW橙色
-        painter.setPen(Qt.NoPen)
-        painter.drawRoundedRect(pixmap.rect().adjusted(4, 4, -4, -4), 8, 8)
-        
-        # 绘制白色"SW"
-        painter.setPen(Qt.white)
-        font = QFont("Arial", 18, QFont.Bold)
-        painter.setFont(font)
-        painter.drawText(pixmap.rect(), Qt.AlignCenter, "SW")
-        
-        painter.end()
-        
-        self.setWindowIcon(QIcon(pixmap))
+        self.setWindowIcon(_get_sw_icon())
     
     def init_ui(self):
         """初始化UI"""
@@ -214,19 +228,22 @@ class LocalGameWindow(QMainWindow):
         # 顶部控制栏
         control_layout = QHBoxLayout()
         
+        # 标签字体，多个标签共用同一实例
+        label_font = QFont('Arial', 14)
+        
         # 分数显示
         self.score_label = QLabel('分数: 0')
-        self.score_label.setFont(QFont('Arial', 14))
+        self.score_label.setFont(label_font)
         control_layout.addWidget(self.score_label)
         
         # 最高分显示
         self.high_score_label = QLabel('最高分: 0')
-        self.high_score_label.setFont(QFont('Arial', 14))
+        self.high_score_label.setFont(label_font)
         control_layout.addWidget(self.high_score_label)
         
         # 移动次数
         self.moves_label = QLabel('移动: 0')
-        self.moves_label.setFont(QFont('Arial', 14))
+        self.moves_label.setFont(label_font)
         control_layout.addWidget(self.moves_label)
         
         # 网格大小选择 - 限制最大8x8
@@ -304,30 +321,56 @@ class LocalGameWindow(QMainWindow):
                 # 检查游戏是否结束
                 if self.game.is_game_over():
                     self.game.game_over = True
+                    # 弹出对话框前同步刷新，显示最终局面
+                    self._do_update_display()
                     self.show_game_over()
-                elif self.game.won and not hasattr(self.game, '_won_shown'):
+                elif self.game.won and not self.game._won_shown:
                     self.game._won_shown = True
+                    self._do_update_display()
                     self.show_game_won()
                 
                 self.update_display()
     
     def update_display(self):
-        """更新显示"""
-        self.game_grid.update_grid(self.game.grid)
-        self.score_label.setText(f'分数: {self.game.score}')
-        self.high_score_label.setText(f'最高分: {self.game.high_score}')
-        self.moves_label.setText(f'移动: {self.game.moves}')
+        """安排刷新显示，同一轮事件循环内的多次请求合并为一次"""
+        if not self._refresh_pending:
+            self._refresh_pending = True
+            QTimer.singleShot(0, self._flush_display)
+    
+    def _flush_display(self):
+        """执行已安排的刷新"""
+        self._refresh_pending = False
+        self._do_update_display()
+    
+    def _do_update_display(self):
+        """立即更新显示"""
+        # 暂停重绘，所有控件更新完成后合并为一次绘制
+        central_widget = self.centralWidget()
+        central_widget.setUpdatesEnabled(False)
+        try:
+            self.game_grid.setUpdatesEnabled(False)
+            try:
+                self.game_grid.update_grid(self.game.get_grid())
+            finally:
+                self.game_grid.setUpdatesEnabled(True)
+            self.score_label.setText(f'分数: {self.game.score}')
+            self.high_score_label.setText(f'最高分: {self.game.high_score}')
+            self.moves_label.setText(f'移动: {self.game.moves}')
+        finally:
+            central_widget.setUpdatesEnabled(True)
     
     def new_game(self):
         """开始新游戏"""
         self.game.reset()
+        self.game._won_shown = False
         self.update_display()
     
     def change_grid_size(self, text):
         """改变网格大小"""
         size = self.size_combo.currentData()
         if size != self.game.size:
-            self.game = Game2048(size)
+            self.game = Game2048(size, persist_high_score=True)
+            self.game._won_shown = False
             self.game_grid.resize_grid(size)
             self.update_display()
     
@@ -353,26 +396,15 @@ class LocalGameWindow(QMainWindow):
     def show_leaderboard(self):
         """显示排行榜"""
         try:
-            import os
-            import json
-            
-            scores_file = os.path.join('saves', 'scores.json')
-            if not os.path.exists(scores_file):
+            top_scores = leaderboard_cache.top(10)
+            if not top_scores:
                 return
-                
-            with open(scores_file, 'r', encoding='utf-8') as f:
-                scores = json.load(f)
-            
-            if not scores:
-                return
-                
-            # 按分数排序
-            scores.sort(key=lambda x: x['score'], reverse=True)
             
             # 创建排行榜文本
-            leaderboard_text = "🏆 排行榜\n"
-            for i, score in enumerate(scores[:10], 1):
-                leaderboard_text += f"{i}. {score['name']}: {score['score']}分\n"
+            leaderboard_text = "🏆 排行榜\n" + "".join(
+                f"{i}. {score['name']}: {score['score']}分\n"
+                for i, score in enumerate(top_scores, 1)
+            )
             
             msg = QMessageBox()
             msg.setWindowTitle('🏆 排行榜')
@@ -413,9 +445,11 @@ class LocalGameWindow(QMainWindow):
     
     def start_online_mode(self):
         """启动联机模式"""
-        try:
-            from game.server_manager import ServerManager
+        if ServerManager is None:
+            QMessageBox.critical(self, '错误', '启动服务器失败: 服务器模块不可用')
+            return
             
+        try:
             # 创建服务器管理器
             self.server_manager = ServerManager(self.config)
             self.server_manager.start_server()
@@ -448,23 +482,6 @@ class LocalGameWindow(QMainWindow):
     def save_score(self, player_name=None):
         """记录分数"""
         try:
-            import os
-            import json
-            from datetime import datetime
-            
-            # 创建分数记录文件
-            scores_file = os.path.join('saves', 'scores.json')
-            os.makedirs('saves', exist_ok=True)
-            
-            # 读取现有分数
-            scores = []
-            if os.path.exists(scores_file):
-                try:
-                    with open(scores_file, 'r', encoding='utf-8') as f:
-                        scores = json.load(f)
-                except:
-                    scores = []
-            
             # 确定玩家名称
             if player_name:
                 name = player_name
@@ -483,15 +500,18 @@ class LocalGameWindow(QMainWindow):
                 'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
                 'mode': 'LAN' if self.server_manager else 'Local'
             }
-            scores.append(new_score)
             
-            # 保存分数
-            with open(scores_file, 'w', encoding='utf-8') as f:
-                json.dump(scores, f, ensure_ascii=False, indent=2)
+            # 先记入内存排行榜，稍后统一写入磁盘
+            leaderboard_cache.add(new_score)
+            QTimer.singleShot(2000, self._flush_scores)
                 
         except Exception as e:
             print(f"保存分数失败: {e}")
     
+    def _flush_scores(self):
+        """将新分数写入磁盘"""
+        leaderboard_cache.flush()
+    
     def get_lan_player_name(self):
         """获取局域网玩家名称"""
         # 简单的局域网玩家命名
@@ -515,8 +535,10 @@ class LocalGameWindow(QMainWindow):
             if reply == QMessageBox.Yes:
                 if self.server_manager:
                     self.server_manager.stop_server()
+                self._flush_scores()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self._flush_scores()
             event.accept()
\ No newline at end of file
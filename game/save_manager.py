@@ -5,12 +5,40 @@
 支持游戏进度保存和恢复功能
 """
 
+import heapq
 import json
 import os
 import pickle
+import re
 from datetime import datetime
+from operator import itemgetter
 from typing import Dict, Any, Optional, List
 
+# 优先使用orjson进行编解码，未安装时回退到标准库json
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def _dumps(obj: Any) -> bytes:
+    """将对象编码为UTF-8字节串（缩进2格）"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def _loads(data: bytes) -> Any:
+    """从UTF-8字节串解码对象"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# 存档开头用于提取元数据的字节数及匹配规则
+META_HEAD_BYTES = 256
+META_PATTERN = re.compile(r'"(date|version)":\s*"([^"]*)"')
+
 class SaveManager:
     """游戏保存管理器"""
     
@@ -42,12 +70,13 @@ class SaveManager:
             save_data = {
                 'timestamp': datetime.now().isoformat(),
                 'date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'game_state': game_state,
-                'version': '2.1.0'
+                'version': '2.1.0',  # 元数据放在game_state之前，列出存档时只需读取文件开头
+                'game_state': game_state
             }
             
-            with open(self.get_save_path(save_name), 'w', encoding='utf-8') as f:
-                json.dump(save_data, f, ensure_ascii=False, indent=2)
+            # 直接以二进制写入编码结果，省去文本层的再次编码
+            with open(self.get_save_path(save_name), 'wb') as f:
+                f.write(_dumps(save_data))
                 
             return True
             
@@ -70,8 +99,8 @@ class SaveManager:
             if not os.path.exists(save_path):
                 return None
                 
-            with open(save_path, 'r', encoding='utf-8') as f:
-                save_data = json.load(f)
+            with open(save_path, 'rb') as f:
+                save_data = _loads(f.read())
                 
             return save_data.get('game_state')
             
@@ -88,27 +117,56 @@ class SaveManager:
         """
         saves = []
         try:
-            for filename in os.listdir(self.save_dir):
-                if filename.endswith('.json'):
-                    save_name = filename[:-5]  # 去掉.json后缀
-                    save_path = os.path.join(self.save_dir, filename)
-                    
-                    try:
-                        with open(save_path, 'r', encoding='utf-8') as f:
-                            save_data = json.load(f)
-                            
-                        saves.append({
-                            'name': save_name,
-                            'date': save_data.get('date', '未知时间'),
-                            'version': save_data.get('version', '未知版本')
-                        })
-                    except:
-                        continue
+            # scandir自带文件类型和stat缓存，按修改时间排序无需打开文件
+            with os.scandir(self.save_dir) as it:
+                entries = [(e.stat().st_mtime, e) for e in it
+                           if e.name.endswith('.json') and e.is_file()]
+            entries.sort(key=lambda item: item[0], reverse=True)
+            
+            for mtime, entry in entries:
+                meta = self._read_save_meta(entry.path)
+                if meta is None:
+                    continue
+                
+                # 文件头中没有日期时以修改时间为准
+                date = meta.get('date') or datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+                saves.append({
+                    'name': entry.name[:-5],  # 去掉.json后缀
+                    'date': date,
+                    'version': meta.get('version', '未知版本')
+                })
                         
         except Exception as e:
             print(f"列出保存文件失败: {e}")
             
-        return sorted(saves, key=lambda x: x['date'], reverse=True)
+        return saves
+    
+    def _read_save_meta(self, save_path: str) -> Optional[Dict[str, Any]]:
+        """
+        读取存档元数据（日期和版本）
+        
+        元数据位于文件开头，只读取少量字节；旧版存档的版本号在末尾，
+        此时才回退为完整解析。
+        
+        Returns:
+            Optional[Dict[str, Any]]: 元数据，不是存档文件时返回None
+        """
+        try:
+            with open(save_path, 'rb') as f:
+                head = f.read(META_HEAD_BYTES).decode('utf-8', errors='ignore')
+            if not head.lstrip().startswith('{'):
+                return None
+                
+            meta = dict(META_PATTERN.findall(head))
+            if 'version' not in meta:
+                with open(save_path, 'rb') as f:
+                    data = _loads(f.read())
+                if not isinstance(data, dict):
+                    return None
+                meta = data
+            return meta
+        except Exception:
+            return None
         
     def delete_save(self, save_name: str) -> bool:
         """
@@ -154,5 +212,75 @@ class SaveManager:
         saves = self.list_saves()
         return saves[0] if saves else None
 
+class LeaderboardCache:
+    """内存中的分数记录，首次使用时从磁盘加载，新分数延迟追加到文件"""
+    
+    def __init__(self, save_dir: str = "saves"):
+        self.scores_file = os.path.join(save_dir, 'scores.jsonl')
+        self.legacy_file = os.path.join(save_dir, 'scores.json')
+        self.entries: Optional[List[Dict[str, Any]]] = None
+        self._pending: List[Dict[str, Any]] = []  # 尚未写入磁盘的分数
+        
+    def _ensure_loaded(self):
+        """首次访问时加载分数记录"""
+        if self.entries is not None:
+            return
+        self.entries = []
+        self._migrate_legacy()
+        
+        try:
+            with open(self.scores_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self.entries.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"加载分数记录失败: {e}")
+            
+    def _migrate_legacy(self):
+        """将旧版scores.json一次性转换为逐行追加的scores.jsonl"""
+        if os.path.exists(self.scores_file) or not os.path.exists(self.legacy_file):
+            return
+        
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                scores = json.load(f)
+        except Exception:
+            scores = []
+        
+        with open(self.scores_file, 'w', encoding='utf-8') as f:
+            for score in scores:
+                f.write(json.dumps(score, ensure_ascii=False) + "\n")
+                
+    def add(self, entry: Dict[str, Any]):
+        """记录新分数，调用flush后才写入磁盘"""
+        self._ensure_loaded()
+        self.entries.append(entry)
+        self._pending.append(entry)
+        
+    def top(self, n: int = 10) -> List[Dict[str, Any]]:
+        """获取分数最高的n条记录"""
+        self._ensure_loaded()
+        return heapq.nlargest(n, self.entries, key=itemgetter('score'))
+        
+    def flush(self) -> bool:
+        """将尚未写入的分数追加到磁盘"""
+        if not self._pending:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self.scores_file) or '.', exist_ok=True)
+            with open(self.scores_file, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(entry, ensure_ascii=False) + "\n"
+                             for entry in self._pending)
+            self._pending.clear()
+            return True
+        except Exception as e:
+            print(f"保存分数失败: {e}")
+            return False
+
 # 全局保存管理器实例
-save_manager = SaveManager()
\ No newline at end of file
+save_manager = SaveManager()
+
+# 全局分数记录实例
+leaderboard_cache = LeaderboardCache()
\ No newline at end of file
@@ -5,12 +5,14 @@
 管理Flask服务器的启动和运行
 """
 
-import threading
 import socket
 from typing import Optional
 
+from PyQt5.QtCore import QCoreApplication, QRunnable, QThreadPool
+
 try:
     from server.flask_app import create_app
+    from werkzeug.serving import make_server
     FLASK_AVAILABLE = True
 except ImportError:
     FLASK_AVAILABLE = False
@@ -18,26 +20,42 @@ except ImportError:
 
 from utils.config import GameConfig
 
+class _FlaskRunner(QRunnable):
+    """在Qt线程池中运行Flask服务器"""
+    
+    def __init__(self, server):
+        super().__init__()
+        self.server = server
+        self.setAutoDelete(True)
+    
+    def run(self):
+        self.server.serve_forever()
+
 class ServerManager:
     """服务器管理器"""
     
     def __init__(self, config: GameConfig):
         self.config = config
         self.app = None
-        self.server_thread = None
+        self.server = None
         self.is_running = False
+        self._local_ip: Optional[str] = None  # 首次解析成功后缓存
+    
+    def _resolve_local_ip(self) -> Optional[str]:
+        """通过UDP socket获取本地局域网IP，没有可用网络时返回None"""
+        try:
+            # UDP connect只选择路由，不会真正发送数据
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(('8.8.8.8', 80))
+                return s.getsockname()[0]
+        except OSError:
+            return None
     
     def get_local_ip(self) -> str:
         """获取本地IP地址"""
-        try:
-            # 创建一个UDP socket来获取本地IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(('8.8.8.8', 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except Exception:
-            return '127.0.0.1'
+        if self._local_ip is None:
+            self._local_ip = self._resolve_local_ip()
+        return self._local_ip or '127.0.0.1'
     
     def start_server(self):
         """启动服务器"""
@@ -47,43 +65,34 @@ class ServerManager:
         if not FLASK_AVAILABLE:
             raise ImportError("Flask依赖未安装，无法启动服务器")
         
-        # 检查网络连接
-        import socket
-        try:
-            socket.create_connection(("8.8.8.8", 53), timeout=3)
-        except (socket.error, OSError):
-            try:
-                socket.create_connection(("192.168.1.1", 80), timeout=3)
-            except (socket.error, OSError):
-                raise ConnectionError("未检测到网络连接，无法启动服务器")
+        # 检查网络连接：能解析出局域网IP即说明网络可用，结果同时缓存供显示地址使用
+        self.get_local_ip()
+        if self._local_ip is None:
+            raise ConnectionError("未检测到网络连接，无法启动服务器")
         
         self.app = create_app()
+        self.app.debug = self.config.get('server.debug', False)
         
-        # 创建服务器线程
-        def run_server():
-            host = self.config.get('server.host', '0.0.0.0')
-            port = self.config.get('server.port', 5000)
-            debug = self.config.get('server.debug', False)
-            
-            self.app.run(
-                host=host,
-                port=port,
-                debug=debug,
-                use_reloader=False,
-                threaded=True
-            )
+        host = self.config.get('server.host', '0.0.0.0')
+        port = self.config.get('server.port', 5000)
+        self.server = make_server(host, port, self.app, threaded=True)
         
-        self.server_thread = threading.Thread(target=run_server, daemon=True)
-        self.server_thread.start()
+        # 交给Qt线程池运行；线程池退出时会等待任务结束，因此随程序退出关闭服务器
+        QThreadPool.globalInstance().start(_FlaskRunner(self.server))
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop_server)
         self.is_running = True
     
     def stop_server(self):
         """停止服务器"""
         # 注意：根据需求，服务器启动后不能关闭
         # 这个方法主要用于程序退出时的清理
-        if self.app and hasattr(self.app, 'shutdown'):
+        if self.server is not None:
             try:
-                self.app.shutdown()
-            except:
+                self.server.shutdown()
+                self.server.server_close()
+            except Exception:
                 pass
+            self.server = None
         self.is_running = False
\ No newline at end of file
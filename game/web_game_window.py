@@ -9,10 +9,30 @@ import sys
 import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, 
                              QWidget, QHBoxLayout, QPushButton, QLabel,
-                             QMessageBox)
-from PyQt5.QtWebEngineWidgets import QWebEngineView
+                             QMessageBox, QStackedWidget)
+from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEnginePage, QWebEngineProfile
 from PyQt5.QtCore import QUrl, QTimer
 
+# 所有网页视图共用的配置，首次使用时创建
+_WEB_PROFILE = None
+
+def _get_web_profile() -> QWebEngineProfile:
+    """获取共享的网页配置，启用磁盘HTTP缓存以加快再次加载"""
+    global _WEB_PROFILE
+    if _WEB_PROFILE is None:
+        storage_path = os.path.abspath(os.path.join('saves', 'webcache'))
+        _WEB_PROFILE = QWebEngineProfile('sw-game', QApplication.instance())
+        _WEB_PROFILE.setPersistentStoragePath(storage_path)
+        _WEB_PROFILE.setCachePath(os.path.join(storage_path, 'cache'))
+        _WEB_PROFILE.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+    return _WEB_PROFILE
+
+def _create_web_view() -> QWebEngineView:
+    """创建使用共享配置的网页视图"""
+    view = QWebEngineView()
+    view.setPage(QWebEnginePage(_get_web_profile(), view))
+    return view
+
 class WebGameWindow(QMainWindow):
     """网页游戏窗口 - 集成网页版游戏到软件中"""
     
@@ -29,9 +49,12 @@ class WebGameWindow(QMainWindow):
         # 创建顶部工具栏
         self.create_toolbar()
         
-        # 创建网页视图
-        self.web_view = QWebEngineView()
-        self.layout.addWidget(self.web_view)
+        # 游戏页和更新/介绍页各用一个网页视图，切换时只改变当前显示的页面
+        self.stack = QStackedWidget()
+        self.layout.addWidget(self.stack)
+        self.web_view = _create_web_view()
+        self.stack.addWidget(self.web_view)
+        self.page_views = {}  # 页面名称 -> 已加载的网页视图
         
         # 加载网页版游戏
         self.load_game()
@@ -92,27 +115,31 @@ class WebGameWindow(QMainWindow):
         self.web_view.settings().setAttribute(self.web_view.settings().WebAttribute.LocalStorageEnabled, True)
         self.web_view.settings().setAttribute(self.web_view.settings().WebAttribute.LocalContentCanAccessFileUrls, True)
 
-    def show_updates(self):
-        """显示更新日志"""
-        updates_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'updates.html')
-        updates_url = QUrl.fromLocalFile(updates_path)
-        self.web_view.load(updates_url)
+    def show_page(self, name):
+        """显示附加页面，首次访问时才创建网页视图并加载"""
+        view = self.page_views.get(name)
+        if view is None:
+            page_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), f'{name}.html')
+            view = _create_web_view()
+            view.load(QUrl.fromLocalFile(page_path))
+            self.stack.addWidget(view)
+            self.page_views[name] = view
+        self.stack.setCurrentWidget(view)
         
         # 5秒后自动返回游戏
         QTimer.singleShot(5000, self.return_to_game)
 
+    def show_updates(self):
+        """显示更新日志"""
+        self.show_page('updates')
+
     def show_welcome(self):
         """显示介绍页面"""
-        welcome_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'welcome.html')
-        welcome_url = QUrl.fromLocalFile(welcome_path)
-        self.web_view.load(welcome_url)
-        
-        # 5秒后自动返回游戏
-        QTimer.singleShot(5000, self.return_to_game)
+        self.show_page('welcome')
     
     def return_to_game(self):
-        """返回游戏"""
-        self.load_game()
+        """返回游戏（游戏页面一直保留，无需重新加载）"""
+        self.stack.setCurrentWidget(self.web_view)
     
     def closeEvent(self, event):
         """关闭事件"""
@@ -7,21 +7,95 @@ SW数字游戏主程序 - 集成局域网服务器管理版
 
 import sys
 import os
+import asyncio
+import http.client
 import socket
 import threading
-import webbrowser
 import logging
+import functools
 from pathlib import Path
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QVBoxLayout, QWidget, 
                            QPushButton, QLabel, QHBoxLayout, QMessageBox, 
-                           QStatusBar, QToolBar, QSplashScreen)
+                           QStatusBar, QToolBar, QSplashScreen, QTextBrowser)
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtCore import QUrl, Qt, QTimer, pyqtSignal, QObject
+from PyQt6.QtCore import QUrl, Qt, QTimer, pyqtSignal, pyqtSlot, QObject, QThread
 from PyQt6.QtGui import QIcon, QDesktopServices, QPixmap, QPainter, QColor, QFont, QRadialGradient, QAction
-from PyQt6.QtWebEngineCore import QWebEngineSettings
+from PyQt6.QtWebEngineCore import QWebEngineSettings, QWebEngineProfile, QWebEnginePage
 "2026.2.19 由于 MAC对PyQt5兼任性太差，决定使用PyQt6"
+
+# 程序目录及常用文件路径，只在加载时计算一次
+APP_DIR = Path(__file__).resolve().parent
+TEMPLATE_PATH = APP_DIR / 'templates' / 'desktop_local.html'
+UPDATES_PATH = APP_DIR / 'updates.html'
+WELCOME_PATH = APP_DIR / 'welcome.html'
+
 # 添加项目根目录到Python路径
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, str(APP_DIR))
+
+# 网页缓存目录：Qt6的默认配置不落盘，每次启动都要重新加载页面资源
+WEB_CACHE_DIR = Path.home() / '.swgame_cache'
+
+@functools.lru_cache(maxsize=1)
+def _get_web_profile():
+    """获取启用磁盘HTTP缓存的网页配置，所有网页视图共用"""
+    profile = QWebEngineProfile('sw-game', QApplication.instance())
+    profile.setCachePath(str(WEB_CACHE_DIR / 'cache'))
+    profile.setPersistentStoragePath(str(WEB_CACHE_DIR / 'storage'))
+    profile.setHttpCacheType(QWebEngineProfile.HttpCacheType.DiskHttpCache)
+    return profile
+
+@functools.lru_cache(maxsize=1)
+def _load_server_backend():
+    """导入Flask应用工厂和waitress，导入较慢，首次启动服务器时才执行"""
+    from server.flask_app import create_app
+    # waitress为可选依赖，未安装时使用Flask自带的开发服务器
+    try:
+        from waitress import create_server
+    except ImportError:
+        create_server = None
+    return create_app, create_server
+
+# 启动画面内容固定，绘制一次后缓存为图片，之后启动直接加载
+# 缓存写入用户缓存目录，打包后APP_DIR位于只读的临时解压目录
+SPLASH_VERSION = "3.2.3"
+SPLASH_CACHE_PATH = WEB_CACHE_DIR / f'splash_{SPLASH_VERSION}.png'
+
+def render_splash_pixmap():
+    """绘制启动画面"""
+    # 创建启动画面，使用更小的尺寸减少内存占用
+    pixmap = QPixmap(500, 300)
+    pixmap.fill(Qt.GlobalColor.transparent)
+    
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)  # 关闭抗锯齿提升性能
+    
+    # 使用简单渐变减少计算开销
+    gradient = QRadialGradient(250, 150, 250)
+    gradient.setColorAt(0, QColor("#667eea"))
+    gradient.setColorAt(1, QColor("#2c3e50"))
+    painter.fillRect(pixmap.rect(), gradient)
+    
+    # 简化标题绘制
+    painter.setPen(QColor("white"))
+    font = QFont("Microsoft YaHei", 28, QFont.Weight.Bold)
+    painter.setFont(font)
+    painter.drawText(pixmap.rect().adjusted(0, 70, 0, 0), Qt.AlignmentFlag.AlignCenter, "SW数字游戏")
+    
+    # 绘制版本号
+    font = QFont("Microsoft YaHei", 12)
+    painter.setFont(font)
+    painter.setPen(QColor(255, 255, 255, 180))
+    painter.drawText(pixmap.rect().adjusted(0, 110, 0, 0), Qt.AlignmentFlag.AlignCenter, f"版本 {SPLASH_VERSION}")
+    
+    # 简化加载文本
+    painter.setPen(QColor(255, 255, 255, 150))
+    font = QFont("Microsoft YaHei", 10)
+    painter.setFont(font)
+    painter.drawText(pixmap.rect().adjusted(0, 160, 0, 0), Qt.AlignmentFlag.AlignCenter, "正在加载...")
+    
+    painter.end()
+    
+    return pixmap
 
 class ServerManager(QObject):
     """局域网服务器管理器 - 性能优化版"""
@@ -32,21 +106,24 @@ class ServerManager(QObject):
         super().__init__()
         self.server_thread = None
         self.app = None
+        self.server = None  # waitress服务器实例
+        self._stopping = False
         self.running = False
         self.port = 5000
+        self._local_ip = None  # 首次获取后缓存
         
-    def check_network_connection(self):
-        """检查网络连接状态"""
+    def get_local_ip(self):
+        """获取本地IP地址，结果缓存，网络不可用时返回127.0.0.1且不缓存"""
+        if self._local_ip:
+            return self._local_ip
         try:
-            # 尝试连接到一个可靠的地址
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(3)  # 3秒超时
-            result = sock.connect_ex(('8.8.8.8', 53))  # Google DNS
-            sock.close()
-            return result == 0
-        except Exception as e:
-            print(f"网络检查错误: {e}")
-            return True  # 如果检查失败，允许继续运行
+            # 创建一个UDP socket来获取本地IP（connect只选择路由，不发送数据）
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+                s.connect(("8.8.8.8", 80))
+                self._local_ip = s.getsockname()[0]
+            return self._local_ip
+        except OSError:
+            return "127.0.0.1"
             
     def check_admin_privileges(self):
         """检查是否具有管理员权限"""
@@ -62,32 +139,41 @@ class ServerManager(QObject):
             return True
             
         try:
-            # 确保正确导入
-            import sys
-            import os
-            sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-            print("os.path可以用于 mac")
-            
-            from server.flask_app import create_app
+            create_app, create_server = _load_server_backend()
             app = create_app()
             print("创建服务器 -导入成功")
             
             # 使用固定端口
             self.port = 5000
             self.app = app
+            self._stopping = False
+            
+            if create_server is not None:
+                # waitress用工作线程池并发处理页面和静态资源请求，允许局域网访问；
+                # 事件循环用poll()代替select()，连接多时不必每轮重建整个文件描述符集合
+                # （没有poll的平台上waitress会自动回退到select）
+                self.server = create_server(app, host='0.0.0.0', port=self.port,
+                                            threads=8, channel_timeout=30,
+                                            asyncore_use_poll=True)
             
             def run_server():
                 try:
-                    # 确保绑定到正确的地址和端口
-                    app.run(
-                        host='0.0.0.0',  # 允许局域网访问
-                        port=5000,
-                        debug=False,
-                        use_reloader=False,
-                        threaded=True,  # 启用线程处理
-                        processes=1     # 限制进程数
-                    )
+                    if self.server is not None:
+                        self.server.run()
+                    else:
+                        # 确保绑定到正确的地址和端口
+                        app.run(
+                            host='0.0.0.0',  # 允许局域网访问
+                            port=5000,
+                            debug=False,
+                            use_reloader=False,
+                            threaded=True,  # 启用线程处理
+                            processes=1     # 限制进程数
+                        )
                 except Exception as e:
+                    if self._stopping:
+                        # 关闭监听socket导致的退出
+                        return
                     print(f"服务器运行错误-2: {e}")
                     self.running = False
                     self.server_stopped.emit()
@@ -96,22 +182,14 @@ class ServerManager(QObject):
             self.server_thread = threading.Thread(target=run_server, daemon=True)
             self.server_thread.start()
             
-            # 等待服务器启动
-            import time
-            time.sleep(2)
+            # 等待服务器端口可以连接，一旦开始监听立即返回；
+            # 再确认响应来自本游戏服务器，而不是占用同一端口的其他程序
+            if asyncio.run(self._await_ready(self.port)) and self._test_server_connection(self.port):
+                self.running = True
+                self.server_started.emit()
+                return True
             
-            # 验证服务器是否正常运行
-            max_attempts = 3
-            for attempt in range(max_attempts):
-                if self._test_server_connection(5000):
-                    self.running = True
-                    self.server_started.emit()
-                    return True
-                else:
-                    # 如果测试失败，再等待一下
-                    time.sleep(1)
-            
-            # 如果所有尝试都失败，标记为运行但发出警告
+            # 如果超时仍未就绪，标记为运行但发出警告
             print("警告: 服务器启动验证失败，但仍继续运行")
             self.running = True
             return True
@@ -122,15 +200,35 @@ class ServerManager(QObject):
             self.running = True
             return True
         
+    async def _await_ready(self, port, timeout=5.0):
+        """等待服务器开始监听，超时返回False"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while loop.time() < deadline:
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection('127.0.0.1', port), 0.2)
+            except (OSError, asyncio.TimeoutError):
+                # 尚未监听，稍后重试
+                await asyncio.sleep(0.05)
+                continue
+            writer.close()
+            await writer.wait_closed()
+            return True
+        print("服务器连接测试失败: 等待端口就绪超时")
+        return False
+    
     def _test_server_connection(self, port):
-        """测试服务器连接"""
+        """用HEAD请求测试游戏页面能否访问（标准库http.client，不下载页面内容）"""
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=0.5)
         try:
-            import requests
-            response = requests.get(f'http://127.0.0.1:{port}/desktop', timeout=3)
-            return response.status_code == 200
-        except Exception as e:
+            conn.request('HEAD', '/desktop')
+            return conn.getresponse().status == 200
+        except (OSError, http.client.HTTPException) as e:
             print(f"服务器连接测试失败: {e}")
             return False
+        finally:
+            conn.close()
     
     def stop_server(self):
         """停止Flask服务器"""
@@ -140,23 +238,18 @@ class ServerManager(QObject):
         try:
             # 标记服务器为非运行状态
             self.running = False
+            self._stopping = True
             
-            # 尝试通过socket连接触发服务器关闭
-            try:
-                sock = socket.create_connection(('127.0.0.1', 5000), timeout=1)
-                sock.close()
-            except Exception as e:
-                print(f"停止服务器时连接失败: {e}")
-            
-            # 等待服务器线程结束
-            if hasattr(self, 'server_thread') and self.server_thread.is_alive():
-                print("等待服务器线程结束...")
-                # 不使用join()，避免阻塞UI
-                import time
-                for _ in range(5):
-                    if not self.server_thread.is_alive():
-                        break
-                    time.sleep(0.5)
+            if self.server is not None:
+                # 关闭waitress服务器，结束服务线程的事件循环
+                self.server.close()
+                self.server = None
+            else:
+                # 开发服务器无法主动关闭，发起一次非阻塞连接唤醒其监听循环；
+                # 服务线程是守护线程，程序退出时会随之结束，无需等待
+                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                    sock.setblocking(False)
+                    sock.connect_ex(('127.0.0.1', self.port))
             
             # 清除服务器引用
             if hasattr(self, 'app'):
@@ -168,6 +261,18 @@ class ServerManager(QObject):
         except Exception as e:
             logging.error(f"停止服务器失败: {e}")
 
+class ServerStartWorker(QObject):
+    """在后台线程中启动服务器，完成后通知界面"""
+    finished = pyqtSignal(bool)
+    
+    def __init__(self, manager):
+        super().__init__()
+        self.manager = manager
+    
+    @pyqtSlot()
+    def run(self):
+        self.finished.emit(self.manager.start_server())
+
 class MainWindow(QMainWindow):
     """主窗口类"""
     def __init__(self):
@@ -177,64 +282,32 @@ class MainWindow(QMainWindow):
         # 优化启动序列，减少延迟
         self.show_splash_screen()
         
-        # 缩短启动时间，使用更高效的初始化序列
-        QTimer.singleShot(2000, self.init_ui)      # 从5秒缩短到2秒
-        QTimer.singleShot(2500, self.load_game_page)  # 合并操作减少延迟
-        QTimer.singleShot(3000, self.close_splash_screen)
+        # 进入事件循环后立即初始化界面，游戏页面加载完成时再关闭启动动画
+        QTimer.singleShot(0, self.init_ui)
     
     def show_splash_screen(self):
         """显示启动动画（性能优化版）"""
-        # 创建启动画面 - 使用缓存机制减少绘制开销
-        self.splash = QSplashScreen()
-        
-        # 创建启动画面，使用更小的尺寸减少内存占用
-        pixmap = QPixmap(500, 300)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)  # 关闭抗锯齿提升性能
-        
-        # 使用简单渐变减少计算开销
-        gradient = QRadialGradient(250, 150, 250)
-        gradient.setColorAt(0, QColor("#667eea"))
-        gradient.setColorAt(1, QColor("#2c3e50"))
-        painter.fillRect(pixmap.rect(), gradient)
-        
-        # 简化标题绘制
-        painter.setPen(QColor("white"))
-        font = QFont("Microsoft YaHei", 28, QFont.Weight.Bold)
-        painter.setFont(font)
-        painter.drawText(pixmap.rect().adjusted(0, 70, 0, 0), Qt.AlignmentFlag.AlignCenter, "SW数字游戏")
-        
-        # 绘制版本号
-        font = QFont("Microsoft YaHei", 12)
-        painter.setFont(font)
-        painter.setPen(QColor(255, 255, 255, 180))
-        painter.drawText(pixmap.rect().adjusted(0, 110, 0, 0), Qt.AlignmentFlag.AlignCenter, "版本 3.2.3")
-        
-        # 简化加载文本
-        painter.setPen(QColor(255, 255, 255, 150))
-        font = QFont("Microsoft YaHei", 10)
-        painter.setFont(font)
-        painter.drawText(pixmap.rect().adjusted(0, 160, 0, 0), Qt.AlignmentFlag.AlignCenter, "正在加载...")
-        
-        painter.end()
+        # 优先加载缓存的启动画面，不存在时绘制并保存
+        pixmap = QPixmap(str(SPLASH_CACHE_PATH))
+        if pixmap.isNull():
+            pixmap = render_splash_pixmap()
+            try:
+                SPLASH_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+                if not pixmap.save(str(SPLASH_CACHE_PATH), 'PNG'):
+                    print(f"缓存启动画面失败: {SPLASH_CACHE_PATH}")
+            except OSError as e:
+                print(f"缓存启动画面失败: {e}")
         
-        self.splash.setPixmap(pixmap)
+        self.splash = QSplashScreen(pixmap)
         self.splash.show()
     
     def close_splash_screen(self):
         """关闭启动动画"""
-        if hasattr(self, 'splash'):
+        if getattr(self, 'splash', None) is not None:
             self.splash.close()
+            self.splash = None
             self.show()  # 显示主窗口
     
-    def load_game_page(self):
-        """加载游戏页面"""
-        game_path = os.path.join(os.path.dirname(__file__), 'templates', 'desktop_local.html')
-        if os.path.exists(game_path):
-            self.web_view.load(QUrl.fromLocalFile(game_path))
-        
     def init_ui(self):
         """初始化UI - 性能优化版"""
         self.setWindowTitle("SW数字游戏 v3.2.4")
@@ -248,31 +321,25 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(central_widget)
         
         # 创建主布局
-        layout = QVBoxLayout(central_widget)
-        layout.setContentsMargins(0, 0, 0, 0)  # 减少边距提升性能
+        self.main_layout = QVBoxLayout(central_widget)
+        self.main_layout.setContentsMargins(0, 0, 0, 0)  # 减少边距提升性能
         
         # 创建工具栏
         self.create_toolbar()
         
-        # 创建Web视图 - 优化配置
-        self.web_view = QWebEngineView()
-        self.web_view.setContextMenuPolicy(Qt.ContextMenuPolicy.NoContextMenu)
-        
-        # 优化WebEngine设置
-        settings = self.web_view.settings()
-        settings.setAttribute(QWebEngineSettings.WebAttribute.LocalStorageEnabled, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptEnabled, True)
-        settings.setAttribute(QWebEngineSettings.WebAttribute.PluginsEnabled, False)  # 禁用插件减少资源
-        
         # 预加载本地游戏页面，减少首次加载时间
-        game_path = os.path.join(os.path.dirname(__file__), 'templates', 'desktop_local.html')
-        if os.path.exists(game_path):
-            self.web_view.load(QUrl.fromLocalFile(game_path))
+        self.web_view = None
+        self.error_view = None
+        if TEMPLATE_PATH.exists():
+            self.ensure_web_view().loadFinished.connect(self.close_splash_screen)
+            self.web_view.load(QUrl.fromLocalFile(str(TEMPLATE_PATH)))
         else:
-            # 简化的错误页面，减少HTML解析负担
-            self.web_view.setHtml(self._get_error_html(game_path))
-        
-        layout.addWidget(self.web_view)
+            # 游戏文件缺失时用QTextBrowser显示简化的错误页面，
+            # 启动局域网之前不创建网页视图，省去Chromium进程的启动开销
+            self.error_view = QTextBrowser()
+            self.error_view.setHtml(self._get_error_html(TEMPLATE_PATH))
+            self.main_layout.addWidget(self.error_view)
+            self.close_splash_screen()
         
         # 创建状态栏
         self.status_bar = QStatusBar()
@@ -283,6 +350,28 @@ class MainWindow(QMainWindow):
         self.server_manager.server_started.connect(self.on_server_started)
         self.server_manager.server_stopped.connect(self.on_server_stopped)
         
+    def ensure_web_view(self):
+        """获取网页视图，首次调用时创建并替换错误页面"""
+        if self.web_view is None:
+            # 创建Web视图 - 优化配置
+            self.web_view = QWebEngineView()
+            self.web_view.setPage(QWebEnginePage(_get_web_profile(), self.web_view))
+            self.web_view.setContextMenuPolicy(Qt.ContextMenuPolicy.NoContextMenu)
+            
+            # 优化WebEngine设置
+            settings = self.web_view.settings()
+            settings.setAttribute(QWebEngineSettings.WebAttribute.LocalStorageEnabled, True)
+            settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptEnabled, True)
+            settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True)
+            settings.setAttribute(QWebEngineSettings.WebAttribute.PluginsEnabled, False)  # 禁用插件减少资源
+            
+            if self.error_view is not None:
+                self.main_layout.removeWidget(self.error_view)
+                self.error_view.deleteLater()
+                self.error_view = None
+            self.main_layout.addWidget(self.web_view)
+        return self.web_view
+        
     def create_toolbar(self):
         """创建工具栏"""
         toolbar = QToolBar()
@@ -330,36 +419,46 @@ class MainWindow(QMainWindow):
                 QMessageBox.Ok
             )
         else:
-            # 立即更新状态提示
+            # 立即更新状态提示，启动期间禁止重复点击
             self.update_status("正在启动局域网服务器...")
+            self.server_action.setEnabled(False)
             
-            # 使用非阻塞方式启动服务器
-            def start_server_async():
-                if self.server_manager.start_server():
-                    # 启动成功后的操作
-                    self.server_action.setText("局域网已启动")
-                    self.server_action.setEnabled(False)
-                    self.update_status("局域网服务器运行中 - http://127.0.0.1:5000/desktop")
-                    
-                    # 显示成功信息
-                    QMessageBox.information(
-                        self, 
-                        "启动成功", 
-                        "局域网服务器启动成功！\n"
-                        "本地访问：http://127.0.0.1:5000/desktop\n"
-                        "局域网访问：http://" + self.get_local_ip() + ":5000/desktop\n\n"
-                        "服务器现已运行，无法手动关闭。"
-                    )
-                    
-                    # 自动加载在线版本
-                    self.web_view.load(QUrl("http://127.0.0.1:5000/desktop"))
-                else:
-                    # 启动失败
-                    self.update_status("局域网服务器启动失败")
-                    QMessageBox.critical(self, "启动失败", "局域网服务器启动失败，请检查端口是否被占用！")
+            # 在后台线程中启动服务器，避免阻塞界面
+            self.server_start_thread = QThread(self)
+            self.server_start_worker = ServerStartWorker(self.server_manager)
+            self.server_start_worker.moveToThread(self.server_start_thread)
+            self.server_start_thread.started.connect(self.server_start_worker.run)
+            self.server_start_worker.finished.connect(self._on_server_start_result)
+            self.server_start_worker.finished.connect(self.server_start_thread.quit)
+            self.server_start_worker.finished.connect(self.server_start_worker.deleteLater)
+            self.server_start_thread.finished.connect(self.server_start_thread.deleteLater)
+            self.server_start_thread.start()
+    
+    def _on_server_start_result(self, success):
+        """服务器启动完成回调（在界面线程中执行）"""
+        if success:
+            # 启动成功后的操作
+            self.server_action.setText("局域网已启动")
+            self.server_action.setEnabled(False)
+            self.update_status("局域网服务器运行中 - http://127.0.0.1:5000/desktop")
+            
+            # 显示成功信息
+            QMessageBox.information(
+                self, 
+                "启动成功", 
+                "局域网服务器启动成功！\n"
+                "本地访问：http://127.0.0.1:5000/desktop\n"
+                "局域网访问：http://" + self.get_local_ip() + ":5000/desktop\n\n"
+                "服务器现已运行，无法手动关闭。"
+            )
             
-            # 延迟启动，让UI有时间更新
-            QTimer.singleShot(100, start_server_async)
+            # 自动加载在线版本
+            self.ensure_web_view().load(QUrl("http://127.0.0.1:5000/desktop"))
+        else:
+            # 启动失败
+            self.server_action.setEnabled(True)
+            self.update_status("局域网服务器启动失败")
+            QMessageBox.critical(self, "启动失败", "局域网服务器启动失败，请检查端口是否被占用！")
                 
     def on_server_started(self):
         """服务器启动回调"""
@@ -375,25 +474,15 @@ class MainWindow(QMainWindow):
         
     def show_updates(self):
         """显示更新日志"""
-        updates_path = os.path.join(os.path.dirname(__file__), 'updates.html')
-        QDesktopServices.openUrl(QUrl.fromLocalFile(updates_path))
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(UPDATES_PATH)))
         
     def show_welcome(self):
         """显示欢迎页面"""
-        welcome_path = os.path.join(os.path.dirname(__file__), 'welcome.html')
-        QDesktopServices.openUrl(QUrl.fromLocalFile(welcome_path))
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(WELCOME_PATH)))
         
     def get_local_ip(self):
         """获取本地IP地址"""
-        try:
-            # 创建一个UDP socket来获取本地IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            ip = s.getsockname()[0]
-            s.close()
-            return ip
-        except:
-            return "127.0.0.1"
+        return self.server_manager.get_local_ip()
 
     def update_status(self, message):
         """更新状态栏"""
@@ -402,17 +491,10 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         """关闭事件 - 性能优化版"""
         try:
-            # 优化关闭流程，避免阻塞
-            if hasattr(self, 'server_manager'):
-                # 使用线程异步处理服务器关闭，避免UI卡顿
-                def cleanup():
-                    # 清理资源
-                    if hasattr(self, 'web_view'):
-                        self.web_view.stop()
-                        self.web_view.deleteLater()
-                
-                cleanup_thread = threading.Thread(target=cleanup, daemon=True)
-                cleanup_thread.start()
+            # 清理网页视图资源：Qt控件只能在界面线程中操作，且这两个调用都很快
+            if getattr(self, 'web_view', None) is not None:
+                self.web_view.stop()
+                self.web_view.deleteLater()
                 
             event.accept()
         except Exception as e:
@@ -487,8 +569,15 @@ def center_window(window):
     # 设置窗口位置和大小
     window.setGeometry(x, y, width, height)
 
+# 游戏界面是简单的本地页面，关闭用不到的GPU合成和媒体功能以加快Chromium子进程启动
+CHROMIUM_FLAGS = ('--disable-gpu --disable-software-rasterizer '
+                  '--disable-features=GlobalMediaControls,MediaRouter --disable-dev-shm-usage')
+
 def main():
     """主函数"""
+    # 必须在创建QApplication之前设置；用户自行设置的参数优先
+    os.environ.setdefault('QTWEBENGINE_CHROMIUM_FLAGS', CHROMIUM_FLAGS)
+    
     # 设置高DPI支持 - 必须在创建QApplication之前设置
     if hasattr(Qt, 'AA_EnableHighDpiScaling'):
         QApplication.setAttribute(Qt.AA_EnableHighDpiScaling, True)
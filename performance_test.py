@@ -5,156 +5,220 @@
 测试服务器优化前后的性能对比
 """
 
-import requests
-import time
-import threading
-import json
+import asyncio
+import math
+import sys
+import timeit
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
+import aiohttp
+import numpy as np
+
+from game.game_logic import Game2048, NUMBA_AVAILABLE
 
 # 测试配置
 BASE_URL = "http://127.0.0.1:5000"
 TEST_DURATION = 30  # 测试持续时间（秒）
 CONCURRENT_USERS = 10  # 并发用户数
+MAX_CONNECTIONS = 200  # 连接池上限
+
+DIRECTIONS = ['left', 'right', 'up', 'down']
+
+# 移动基准测试配置
+MOVE_BENCH_BOARDS = 1000  # 随机棋盘数
+MOVE_BENCH_REPEAT = 5     # 重复次数，取最快的一次
+
+# 响应时间直方图的桶边界（0.1毫秒~10秒，对数均匀分布）
+BUCKET_EDGES = np.logspace(-4, 1, 101).tolist()
 
-# 测试结果
-results = {
-    'total_requests': 0,
-    'successful_requests': 0,
-    'failed_requests': 0,
-    'total_response_time': 0,
-    'response_times': []
-}
-
-# 测试锁
-lock = threading.Lock()
-
-class TestUser(threading.Thread):
-    """测试用户线程"""
-    def __init__(self, user_id):
-        super().__init__()
-        self.user_id = user_id
-        self.session = requests.Session()
+@dataclass
+class TestResults:
+    """测试结果，响应时间以流式统计（Welford算法+直方图）记录，不保存每个样本"""
+    total_requests: int = 0
+    successful_requests: int = 0
+    failed_requests: int = 0
+    mean: float = 0.0  # 成功请求的平均响应时间
+    m2: float = 0.0    # 与平均值之差的平方和
+    buckets: list = field(default_factory=lambda: [0] * (len(BUCKET_EDGES) + 1))
     
-    def run(self):
-        start_time = time.time()
-        while time.time() - start_time < TEST_DURATION:
-            # 测试获取游戏状态
-            self.test_get_game_state()
-            # 测试创建新游戏
-            self.test_new_game()
-            # 测试移动操作
-            self.test_move()
+    def add_success(self, response_time):
+        """记录一次成功请求"""
+        self.total_requests += 1
+        self.successful_requests += 1
+        delta = response_time - self.mean
+        self.mean += delta / self.successful_requests
+        self.m2 += delta * (response_time - self.mean)
+        self.buckets[bisect_right(BUCKET_EDGES, response_time)] += 1
+    
+    def add_failure(self):
+        """记录一次失败请求"""
+        self.total_requests += 1
+        self.failed_requests += 1
     
-    def test_get_game_state(self):
-        """测试获取游戏状态"""
-        try:
-            start = time.time()
-            response = self.session.get(f"{BASE_URL}/api/game/state")
-            end = time.time()
-            response_time = end - start
-            
-            with lock:
-                results['total_requests'] += 1
-                if response.status_code == 200:
-                    results['successful_requests'] += 1
-                    results['total_response_time'] += response_time
-                    results['response_times'].append(response_time)
-                else:
-                    results['failed_requests'] += 1
-        except Exception as e:
-            with lock:
-                results['total_requests'] += 1
-                results['failed_requests'] += 1
+    def merge(self, other):
+        """合并另一个用户的测试结果"""
+        n_a, n_b = self.successful_requests, other.successful_requests
+        n = n_a + n_b
+        if n_b:
+            delta = other.mean - self.mean
+            self.mean += delta * n_b / n
+            self.m2 += other.m2 + delta * delta * n_a * n_b / n
+        self.total_requests += other.total_requests
+        self.successful_requests = n
+        self.failed_requests += other.failed_requests
+        self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
     
-    def test_new_game(self):
-        """测试创建新游戏"""
-        try:
-            start = time.time()
-            response = self.session.post(f"{BASE_URL}/api/game/new", json={"size": 4})
-            end = time.time()
-            response_time = end - start
-            
-            with lock:
-                results['total_requests'] += 1
-                if response.status_code == 200:
-                    results['successful_requests'] += 1
-                    results['total_response_time'] += response_time
-                    results['response_times'].append(response_time)
-                else:
-                    results['failed_requests'] += 1
-        except Exception as e:
-            with lock:
-                results['total_requests'] += 1
-                results['failed_requests'] += 1
+    def stdev(self):
+        """响应时间的标准差"""
+        if self.successful_requests < 2:
+            return 0.0
+        return math.sqrt(self.m2 / (self.successful_requests - 1))
     
-    def test_move(self):
-        """测试移动操作"""
-        try:
-            directions = ['left', 'right', 'up', 'down']
-            for direction in directions:
-                start = time.time()
-                response = self.session.post(f"{BASE_URL}/api/game/move", json={"direction": direction})
-                end = time.time()
-                response_time = end - start
-                
-                with lock:
-                    results['total_requests'] += 1
-                    if response.status_code == 200:
-                        results['successful_requests'] += 1
-                        results['total_response_time'] += response_time
-                        results['response_times'].append(response_time)
-                    else:
-                        results['failed_requests'] += 1
-        except Exception as e:
-            with lock:
-                results['total_requests'] += 1
-                results['failed_requests'] += 1
+    def percentile(self, q):
+        """响应时间的分位数（取所在桶的上边界）"""
+        target = self.successful_requests * q / 100
+        cumulative = 0
+        for i, count in enumerate(self.buckets):
+            cumulative += count
+            if count and cumulative >= target:
+                return BUCKET_EDGES[min(i, len(BUCKET_EDGES) - 1)]
+        return 0.0
+
+async def timed_request(session, method, url, results, **kwargs):
+    """发送一次请求并记录结果"""
+    loop = asyncio.get_running_loop()
+    try:
+        start = loop.time()
+        async with session.request(method, url, **kwargs) as response:
+            await response.read()
+            status = response.status
+        response_time = loop.time() - start
+    except Exception:
+        status = None
+    
+    if status == 200:
+        results.add_success(response_time)
+    else:
+        results.add_failure()
+
+async def user(connector, user_id, deadline):
+    """模拟一个测试用户，返回该用户的测试结果"""
+    loop = asyncio.get_running_loop()
+    results = TestResults()
+    
+    # 每个用户使用独立的会话（独立的cookie即独立的游戏），共享同一个连接池；
+    # 服务器地址是IP，需要unsafe=True才会保存cookie
+    cookie_jar = aiohttp.CookieJar(unsafe=True)
+    async with aiohttp.ClientSession(connector=connector, connector_owner=False,
+                                     cookie_jar=cookie_jar) as session:
+        while loop.time() < deadline:
+            # 测试获取游戏状态
+            await timed_request(session, 'GET', f"{BASE_URL}/api/game/state", results)
+            # 测试创建新游戏
+            await timed_request(session, 'POST', f"{BASE_URL}/api/game/new", results, json={"size": 4})
+            # 测试移动操作
+            for direction in DIRECTIONS:
+                await timed_request(session, 'POST', f"{BASE_URL}/api/game/move", results,
+                                    json={"direction": direction})
+    return results
+
+def merge_results(user_results):
+    """合并各个用户的测试结果"""
+    results = TestResults()
+    for item in user_results:
+        results.merge(item)
+    return results
+
+async def fetch_performance_data(connector):
+    """获取服务器性能数据"""
+    try:
+        async with aiohttp.ClientSession(connector=connector, connector_owner=False) as session:
+            async with session.get(f"{BASE_URL}/api/performance") as response:
+                if response.status != 200:
+                    return None
+                return await response.json()
+    except Exception as e:
+        print(f"获取服务器性能数据失败: {e}")
+        return None
+
+async def run_load():
+    """在同一个事件循环中运行所有测试用户，返回测试结果和服务器性能数据"""
+    loop = asyncio.get_running_loop()
+    # 所有请求共用一个长连接池，测试结束后查询性能数据也复用已建立的连接
+    connector = aiohttp.TCPConnector(limit=MAX_CONNECTIONS, keepalive_timeout=TEST_DURATION)
+    try:
+        deadline = loop.time() + TEST_DURATION
+        user_results = await asyncio.gather(
+            *[user(connector, i, deadline) for i in range(CONCURRENT_USERS)]
+        )
+        performance_data = await fetch_performance_data(connector)
+    finally:
+        await connector.close()
+    return merge_results(user_results), performance_data
 
 def run_performance_test():
     """运行性能测试"""
     print("开始性能测试...")
     print(f"测试配置: 并发用户数={CONCURRENT_USERS}, 测试持续时间={TEST_DURATION}秒")
     
-    # 创建并启动测试用户线程
-    threads = []
-    for i in range(CONCURRENT_USERS):
-        user = TestUser(i)
-        threads.append(user)
-        user.start()
-    
-    # 等待所有线程完成
-    for thread in threads:
-        thread.join()
+    # 运行所有测试用户直到测试结束
+    results, performance_data = asyncio.run(run_load())
     
     # 计算测试结果
-    avg_response_time = 0
-    if results['successful_requests'] > 0:
-        avg_response_time = results['total_response_time'] / results['successful_requests']
-    
-    throughput = results['total_requests'] / TEST_DURATION
-    success_rate = (results['successful_requests'] / results['total_requests']) * 100 if results['total_requests'] > 0 else 0
+    throughput = results.total_requests / TEST_DURATION
+    success_rate = (results.successful_requests / results.total_requests) * 100 if results.total_requests > 0 else 0
     
     # 输出测试结果
     print("\n性能测试结果:")
-    print(f"总请求数: {results['total_requests']}")
-    print(f"成功请求数: {results['successful_requests']}")
-    print(f"失败请求数: {results['failed_requests']}")
+    print(f"总请求数: {results.total_requests}")
+    print(f"成功请求数: {results.successful_requests}")
+    print(f"失败请求数: {results.failed_requests}")
     print(f"成功率: {success_rate:.2f}%")
-    print(f"平均响应时间: {avg_response_time:.4f}秒")
+    print(f"平均响应时间: {results.mean:.4f}秒")
+    print(f"响应时间标准差: {results.stdev():.4f}秒")
+    print(f"响应时间P50/P95/P99: {results.percentile(50):.4f}/{results.percentile(95):.4f}/{results.percentile(99):.4f}秒")
     print(f"吞吐量: {throughput:.2f}请求/秒")
     
-    # 获取服务器性能数据
-    try:
-        response = requests.get(f"{BASE_URL}/api/performance")
-        if response.status_code == 200:
-            performance_data = response.json()
-            print("\n服务器性能数据:")
-            print(f"服务器运行时间: {performance_data['uptime']:.2f}秒")
-            print(f"内存使用: {performance_data['memory_usage']:.2f}MB")
-            print(f"CPU使用率: {performance_data['cpu_usage']:.2f}%")
-            print(f"活跃游戏数: {performance_data['active_games']}")
-            print(f"活跃房间数: {performance_data['active_rooms']}")
-    except Exception as e:
-        print(f"获取服务器性能数据失败: {e}")
+    # 输出服务器性能数据
+    if performance_data is not None:
+        print("\n服务器性能数据:")
+        print(f"服务器运行时间: {performance_data['uptime']:.2f}秒")
+        print(f"内存使用: {performance_data['memory_usage']:.2f}MB")
+        print(f"CPU使用率: {performance_data['cpu_usage']:.2f}%")
+        print(f"活跃游戏数: {performance_data['active_games']}")
+        print(f"活跃房间数: {performance_data['active_rooms']}")
+
+def run_move_benchmark():
+    """移动基准测试：比较4×4棋盘查表和逐行合并两种实现的单次移动耗时"""
+    print("开始移动基准测试...")
+    rng = np.random.default_rng(0)
+    boards = [
+        np.where(rng.random((4, 4)) < 0.6, 1 << rng.integers(1, 12, (4, 4)), 0).astype(np.int32)
+        for _ in range(MOVE_BENCH_BOARDS)
+    ]
+    # 与游戏中一样，在四个方向的视图上向左移动
+    views = [view for b in boards for view in (b, b[:, ::-1], b.T, b.T[:, ::-1])]
+    game = Game2048(4)
+    
+    def bench(move):
+        move(views[0])  # 预热（numba首次调用时编译）
+        best = min(timeit.repeat(lambda: [move(view) for view in views],
+                                 number=1, repeat=MOVE_BENCH_REPEAT))
+        return best / len(views) * 1e6
+    
+    table_time = bench(game._move_left_by_table)
+    rows_time = bench(game._move_left_by_rows)
+    
+    print("\n移动基准测试结果:")
+    print(f"numba: {'已安装' if NUMBA_AVAILABLE else '未安装'}")
+    print(f"查表: {table_time:.2f}微秒/次")
+    print(f"逐行合并: {rows_time:.2f}微秒/次")
+    print(f"游戏使用: {'逐行合并' if NUMBA_AVAILABLE else '查表'}")
 
 if __name__ == "__main__":
-    run_performance_test()
+    # python performance_test.py move 只运行移动基准测试，不需要启动服务器
+    if sys.argv[1:] == ['move']:
+        run_move_benchmark()
+    else:
+        run_performance_test()
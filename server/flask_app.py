@@ -5,74 +5,388 @@ Flask应用工厂
 创建和配置Flask应用
 """
 
-from flask import Flask, render_template, request, jsonify, session, send_file
+from flask import Flask, Response, render_template, request, jsonify, session, send_from_directory, make_response
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.exceptions import MethodNotAllowed
 from flask_socketio import SocketIO, emit, join_room, leave_room
 import secrets
 import json
-import concurrent.futures
+import os
 import time
 import threading
+from collections import OrderedDict, deque
 import psutil
 print("服务器模块导入成功")
 
+# 尝试导入orjson（更快的JSON序列化）
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# 尝试导入Flask-Session（会话存入Redis）
+try:
+    from flask_session import Session
+    FLASK_SESSION_AVAILABLE = True
+except ImportError:
+    Session = None
+    FLASK_SESSION_AVAILABLE = False
+
 from utils.config import GameConfig
 from utils.device_detector import get_device_info
 from game.game_logic import Game2048
-from server.leaderboard import leaderboard
+from server.leaderboard import LEADERBOARD_CACHE_KEY, leaderboard
+from server.redis_client import get_redis, redis
 print("导入成功")
 
-# 创建线程池
-executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+# 项目根目录，模板、静态资源和说明页面都在这里
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(BASE_DIR, 'templates')
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+
+# API响应统一添加的跨域响应头
+CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type, Authorization'),
+)
+
+# 排行榜JSON缓存的有效期（秒）
+LEADERBOARD_CACHE_TTL = 3
+# 重建排行榜缓存时持有的Redis锁，其他请求等待重建完成而不是同时查询排行榜
+LEADERBOARD_LOCK_KEY = LEADERBOARD_CACHE_KEY + ":lock"
+LEADERBOARD_LOCK_TTL = 5
+LEADERBOARD_LOCK_WAIT = 0.01
+LEADERBOARD_LOCK_RETRIES = 20
+# 只有锁的值仍是自己的令牌时才删除，避免重建超时后删掉其他请求的锁
+RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# 更新说明/欢迎页面的浏览器缓存时间（秒）
+STATIC_PAGE_MAX_AGE = 3600
+
+# Redis中房间状态和玩家集合的键前缀
+ROOM_STATE_PREFIX = "room:v1:state:"
+ROOM_PLAYERS_PREFIX = "room:v1:players:"
+
+# CPU使用率的采样间隔（秒）
+CPU_SAMPLE_INTERVAL = 1.0
+
+# 当前进程，用于读取内存和CPU使用情况
+process = psutil.Process()
+
+# 房间动作合并广播的时间窗口（秒）
+BROADCAST_WINDOW = 0.02
+
+# 游戏状态的容量上限和闲置过期时间（秒）
+GAME_CACHE_SIZE = 10000
+GAME_TTL = 1800
+
+class AtomicCounter:
+    """线程安全的计数器，只在自增时加锁"""
+    
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+    
+    def increment(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+    
+    @property
+    def value(self) -> int:
+        return self._value
+
+class RollingWindow:
+    """保留最近maxlen个样本的滑动窗口，同时维护窗口内的总和，求平均值为O(1)"""
+    
+    def __init__(self, maxlen: int):
+        self._values = deque(maxlen=maxlen)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+    
+    def append(self, value: float):
+        with self._lock:
+            values = self._values
+            if len(values) == values.maxlen:
+                self._sum -= values[0]
+            values.append(value)
+            self._sum += value
+    
+    def mean(self) -> float:
+        with self._lock:
+            return self._sum / len(self._values) if self._values else 0
+    
+    def __len__(self) -> int:
+        return len(self._values)
+
+class CpuSampler:
+    """后台线程定期采样进程CPU使用率，请求处理时直接读取缓存值
+    
+    采样线程在第一次start()时启动，之后重复调用（多次create_app）不会再创建线程
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.value = 0.0
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            self.value = process.cpu_percent(interval=self.interval)
+
+# 整个进程共用一个CPU采样器
+cpu_sampler = CpuSampler(CPU_SAMPLE_INTERVAL)
+
+class ShardedDict:
+    """按键的哈希分片的字典，每个分片有独立的锁，不同会话的写入互不阻塞
+    
+    指定maxsize/ttl时每个分片按LRU淘汰：超过容量淘汰最久未访问的键，
+    超过ttl秒未访问的键自动过期
+    """
+    
+    def __init__(self, n: int = 16, maxsize: int = None, ttl: float = None):
+        self.n = n
+        self.shard_maxsize = max(1, maxsize // n) if maxsize else None
+        self.ttl = ttl
+        self.shards = [OrderedDict() for _ in range(n)]  # key -> (value, expires)
+        self.locks = [threading.Lock() for _ in range(n)]
+    
+    def _index(self, key) -> int:
+        return hash(key) % self.n
+    
+    def _expires(self, now: float) -> float:
+        return now + self.ttl if self.ttl is not None else float('inf')
+    
+    def _expire(self, shard, now: float):
+        """清除分片头部已过期的键（调用方持有分片锁）"""
+        while shard:
+            key, (_, expires) = next(iter(shard.items()))
+            if expires > now:
+                break
+            del shard[key]
+    
+    def __getitem__(self, key):
+        i = self._index(key)
+        shard = self.shards[i]
+        now = time.time()
+        with self.locks[i]:
+            value, expires = shard[key]
+            if expires <= now:
+                del shard[key]
+                raise KeyError(key)
+            # 访问时续期并移到队尾
+            shard[key] = (value, self._expires(now))
+            shard.move_to_end(key)
+            return value
+    
+    def _store(self, shard, key, value, now: float):
+        """写入键并按容量淘汰（调用方持有分片锁）"""
+        shard[key] = (value, self._expires(now))
+        shard.move_to_end(key)
+        self._expire(shard, now)
+        if self.shard_maxsize is not None:
+            while len(shard) > self.shard_maxsize:
+                shard.popitem(last=False)
+    
+    def __setitem__(self, key, value):
+        i = self._index(key)
+        with self.locks[i]:
+            self._store(self.shards[i], key, value, time.time())
+    
+    def __delitem__(self, key):
+        i = self._index(key)
+        with self.locks[i]:
+            del self.shards[i][key]
+    
+    def __contains__(self, key) -> bool:
+        item = self.shards[self._index(key)].get(key)
+        return item is not None and item[1] > time.time()
+    
+    def __len__(self) -> int:
+        now = time.time()
+        total = 0
+        for shard, lock in zip(self.shards, self.locks):
+            with lock:
+                self._expire(shard, now)
+                total += len(shard)
+        return total
+    
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def get_or_create(self, key, factory):
+        """获取键对应的值，不存在时用factory()创建，检查和创建在同一把锁内完成"""
+        i = self._index(key)
+        shard = self.shards[i]
+        now = time.time()
+        with self.locks[i]:
+            item = shard.get(key)
+            if item is not None and item[1] > now:
+                shard[key] = (item[0], self._expires(now))
+                shard.move_to_end(key)
+                return item[0]
+            value = factory()
+            self._store(shard, key, value, now)
+            return value
+    
+    def pop(self, key, default=None):
+        i = self._index(key)
+        with self.locks[i]:
+            item = self.shards[i].pop(key, None)
+        if item is None or item[1] <= time.time():
+            return default
+        return item[0]
+
+class Room:
+    """联机房间，玩家集合和房间内的游戏由房间自己的锁保护"""
+    
+    def __init__(self, size: int = 4):
+        self.players = set()
+        self.game = Game2048(size)
+        self.lock = threading.Lock()
+        self.broadcast_pending = False  # 是否已安排了一次广播
+    
+    def add_player(self, sid) -> int:
+        """加入玩家，返回当前玩家数"""
+        with self.lock:
+            self.players.add(sid)
+            return len(self.players)
+    
+    def apply_action(self, action, data) -> bool:
+        """执行游戏动作，返回游戏状态是否改变（调用方持有房间锁）"""
+        game = self.game
+        if action == 'move_left':
+            return game.move_left()
+        elif action == 'move_right':
+            return game.move_right()
+        elif action == 'move_up':
+            return game.move_up()
+        elif action == 'move_down':
+            return game.move_down()
+        elif action == 'new_game':
+            self.game = Game2048(data.get('size', 4))
+            return True
+        return False
+
+# orjson可以直接序列化numpy数组，此时游戏状态中的网格不必先转换成列表
+RAW_GRID = ORJSON_AVAILABLE
+
+class OrjsonProvider(DefaultJSONProvider):
+    """使用orjson的JSON提供器，jsonify直接输出orjson生成的字节"""
+    
+    option = orjson.OPT_SERIALIZE_NUMPY if ORJSON_AVAILABLE else 0
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
 
 def create_app():
     """创建Flask应用"""
-    from utils.config import GameConfig
     config = GameConfig()
     
-    # 获取当前目录的绝对路径
-    import os
-    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    
     app = Flask(__name__, 
-                template_folder=os.path.join(base_dir, 'templates'),
-                static_folder=os.path.join(base_dir, 'static'))
+                template_folder=TEMPLATE_DIR,
+                static_folder=STATIC_DIR)
+    
+    if ORJSON_AVAILABLE:
+        app.json = OrjsonProvider(app)
     
     # 配置
     app.config['SECRET_KEY'] = secrets.token_hex(16)
     app.config['CONFIG'] = config
+    # 不为每个路由自动生成OPTIONS响应，API的预检请求由下面的api_preflight统一处理
+    app.config['PROVIDE_AUTOMATIC_OPTIONS'] = False
+    
+    # 配置了Redis时会话存入Redis，cookie中只保存会话ID，不必每次请求都签名整个会话
+    session_redis = get_redis(decode_responses=False) if FLASK_SESSION_AVAILABLE else None
+    if session_redis is not None:
+        app.config['SESSION_TYPE'] = 'redis'
+        app.config['SESSION_REDIS'] = session_redis
+        app.config['SESSION_KEY_PREFIX'] = 'session:'
+        app.config['PERMANENT_SESSION_LIFETIME'] = GAME_TTL
+        Session(app)
     
     # 性能监控数据
     performance_data = {
-        'request_times': [],
+        'request_times': RollingWindow(1000),  # 只保留最近1000个请求的时间
         'start_time': time.time(),
-        'total_requests': 0,
-        'error_count': 0
+        'total_requests': AtomicCounter(),
+        'error_count': AtomicCounter()
     }
     
+    cpu_sampler.start()
+    
     # 性能监控中间件
     @app.before_request
     def before_request():
         request.start_time = time.time()
-        performance_data['total_requests'] += 1
+        performance_data['total_requests'].increment()
     
     @app.after_request
     def after_request(response):
         if hasattr(request, 'start_time'):
             request_time = time.time() - request.start_time
             performance_data['request_times'].append(request_time)
-            # 只保留最近1000个请求的时间
-            if len(performance_data['request_times']) > 1000:
-                performance_data['request_times'] = performance_data['request_times'][-1000:]
         return response
     
+    # API的跨域响应头统一在这里添加
+    @app.after_request
+    def add_cors_headers(response):
+        if request.path.startswith('/api/'):
+            response.headers.update(CORS_HEADERS)
+        return response
+    
+    @app.before_request
+    def api_preflight():
+        """跨域预检请求，响应头由add_cors_headers添加
+        
+        只应答存在的API路径（路由匹配结果为方法不允许），不存在的路径仍返回404
+        """
+        if (request.method == 'OPTIONS' and request.path.startswith('/api/')
+                and isinstance(request.routing_exception, MethodNotAllowed)):
+            return '', 204
+    
     @app.errorhandler(500)
     def handle_error(e):
-        performance_data['error_count'] += 1
+        performance_data['error_count'].increment()
         return jsonify({'error': str(e)}), 500
     
+    # 配置了Redis时房间状态存入Redis，多个服务器进程通过Redis消息队列互相转发广播
+    room_redis = get_redis()
+    message_queue = config.get('server.redis_url') if room_redis is not None else None
+    
     # 初始化SocketIO - 优化配置确保稳定运行
     socketio = SocketIO(app, 
+                       message_queue=message_queue,
                        cors_allowed_origins="*", 
+                       # 服务器运行在桌面程序的后台线程中（waitress/QThread），
+                       # eventlet/gevent需要对整个进程打猴子补丁，会影响Qt线程，因此固定使用线程模式
                        async_mode='threading', 
                        logger=False, 
                        engineio_logger=False,
@@ -81,8 +395,8 @@ def create_app():
                        ping_interval=25)  # 调整ping间隔
     
     # 存储游戏状态
-    games = {}  # session_id -> Game2048
-    rooms = {}  # room_id -> {players: set(), game: Game2048}
+    games = ShardedDict(maxsize=GAME_CACHE_SIZE, ttl=GAME_TTL)  # session_id -> Game2048
+    rooms = ShardedDict()  # room_id -> Room
     
     @app.route('/')
     def index():
@@ -112,18 +426,24 @@ def create_app():
             config=config.config
         )
 
+    def conditional_page(template_name):
+        """渲染页面并附带ETag，内容未变化时浏览器缓存可直接命中（304）"""
+        response = make_response(render_template(template_name, config=config.config))
+        response.add_etag()
+        return response.make_conditional(request)
+
     @app.route('/desktop')
     def desktop():
-        return render_template('desktop.html', config=config.config)
+        return conditional_page('desktop.html')
 
     @app.route('/software')
     def software():
-        return render_template('software_embedded.html', config=config.config)
+        return conditional_page('software_embedded.html')
     
     @app.route('/local')
     def local_access():
         """本地访问专用路由 - 确保打包后可直接访问"""
-        return render_template('desktop.html', config=config.config)
+        return conditional_page('desktop.html')
     # 获取排行榜数据函数
     def get_leaderboard_data():
         """获取排行榜数据"""
@@ -131,15 +451,63 @@ def create_app():
             return leaderboard.get_top_scores()
         except Exception as e:
             return []
+    
+    # 未配置Redis时使用的进程内缓存
+    leaderboard_cache = {'payload': None, 'expires': 0.0}
+    leaderboard_cache_lock = threading.Lock()
+    
+    def get_leaderboard_json_redis(r):
+        """从Redis读取排行榜缓存；缓存失效时只有拿到锁的请求重建，其余请求稍等后重新读取"""
+        payload = r.get(LEADERBOARD_CACHE_KEY)
+        if payload is not None:
+            return payload
+        
+        token = secrets.token_hex(8)
+        if r.set(LEADERBOARD_LOCK_KEY, token, nx=True, ex=LEADERBOARD_LOCK_TTL):
+            try:
+                payload = app.json.dumps(get_leaderboard_data())
+                r.setex(LEADERBOARD_CACHE_KEY, LEADERBOARD_CACHE_TTL, payload)
+                return payload
+            finally:
+                r.register_script(RELEASE_LOCK_SCRIPT)(keys=[LEADERBOARD_LOCK_KEY], args=[token])
+        
+        for _ in range(LEADERBOARD_LOCK_RETRIES):
+            time.sleep(LEADERBOARD_LOCK_WAIT)
+            payload = r.get(LEADERBOARD_CACHE_KEY)
+            if payload is not None:
+                return payload
+        
+        # 重建的请求迟迟没有完成，自己查询
+        return app.json.dumps(get_leaderboard_data())
+    
+    def get_leaderboard_json():
+        """获取序列化后的排行榜JSON，短时间内的重复请求直接使用缓存"""
+        r = get_redis()
+        if r is not None:
+            return get_leaderboard_json_redis(r)
+        
+        payload = leaderboard_cache['payload']
+        if payload is not None and time.time() < leaderboard_cache['expires']:
+            return payload
+        
+        # 同一时刻只有一个线程重建缓存，其余线程等待后直接使用新的缓存
+        with leaderboard_cache_lock:
+            now = time.time()
+            if leaderboard_cache['payload'] is None or now >= leaderboard_cache['expires']:
+                leaderboard_cache['payload'] = app.json.dumps(get_leaderboard_data())
+                leaderboard_cache['expires'] = now + LEADERBOARD_CACHE_TTL
+            return leaderboard_cache['payload']
+    
+    def invalidate_leaderboard_cache():
+        """排行榜更新后清除进程内缓存（Redis中的缓存由排行榜写入时一并删除）"""
+        leaderboard_cache['payload'] = None
 
     @app.route('/api/leaderboard')
     def get_leaderboard():
         """获取排行榜"""
         try:
-            data = get_leaderboard_data()
-            response = jsonify(data)
-            response.headers['Content-Type'] = 'application/json; charset=utf-8'
-            return response
+            return Response(get_leaderboard_json(), mimetype='application/json',
+                            content_type='application/json; charset=utf-8')
         except Exception as e:
             return jsonify({"error": str(e)}), 500
 
@@ -151,18 +519,7 @@ def create_app():
             if not session_id or session_id not in games:
                 return jsonify({'error': 'Game not found'}), 404
             
-            def get_state():
-                return games[session_id].get_state()
-            
-            # 使用线程池处理状态获取
-            future = executor.submit(get_state)
-            game_state = future.result()
-            
-            response = jsonify(game_state)
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-            return response
+            return jsonify(games[session_id].get_state(raw_grid=RAW_GRID))
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
@@ -176,38 +533,26 @@ def create_app():
         data = request.get_json()
         direction = data.get('direction')
         
-        def execute_move():
-            game = games[session_id]
-            moved = False
-            
-            if direction == 'left':
-                moved = game.move_left()
-            elif direction == 'right':
-                moved = game.move_right()
-            elif direction == 'up':
-                moved = game.move_up()
-            elif direction == 'down':
-                moved = game.move_down()
-            
-            return moved, game.get_state()
+        game = games[session_id]
+        moved = False
         
-        # 使用线程池处理游戏移动
-        future = executor.submit(execute_move)
-        moved, game_state = future.result()
+        if direction == 'left':
+            moved = game.move_left()
+        elif direction == 'right':
+            moved = game.move_right()
+        elif direction == 'up':
+            moved = game.move_up()
+        elif direction == 'down':
+            moved = game.move_down()
         
-        response = jsonify({
+        return jsonify({
             'moved': moved,
-            'state': game_state
+            'state': game.get_state(raw_grid=RAW_GRID)
         })
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        return response
     
     @app.route('/api/game/new', methods=['POST'])
     def new_game():
         """开始新游戏"""
-        # 在主线程中获取session和请求数据
         session_id = session.get('session_id')
         if not session_id:
             session_id = secrets.token_hex(8)
@@ -221,32 +566,17 @@ def create_app():
         if (device_info['is_mobile'] or device_info['is_tablet']) and size > 8:
             size = 8
         
-        def create_game():
-            game = Game2048(size)
-            games[session_id] = game
-            return game.get_state()
-        
-        # 使用线程池处理游戏创建
-        future = executor.submit(create_game)
-        game_state = future.result()
+        game = Game2048(size)
+        games[session_id] = game
         
-        response = jsonify(game_state)
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        return response
+        return jsonify(game.get_state(raw_grid=RAW_GRID))
     
     @app.route('/api/game/scores')
     def get_scores():
         """获取公开排行榜"""
         try:
-            scores = leaderboard.get_top_scores()
-            response = jsonify(scores)
-            response.headers['Content-Type'] = 'application/json; charset=utf-8'
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-            return response
+            return Response(get_leaderboard_json(), mimetype='application/json',
+                            content_type='application/json; charset=utf-8')
         except Exception as e:
             app.logger.error(f"获取排行榜失败: {e}")
             return jsonify({'error': str(e), 'scores': []}), 500
@@ -272,56 +602,41 @@ def create_app():
             
             # 更新或添加分数（同一个玩家只保留最高分）
             leaderboard.add_or_update_score(player_name, score, max_tile, moves, size)
+            invalidate_leaderboard_cache()
             
-            response = jsonify({'success': True, 'player_id': player_id})
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-            return response
+            return jsonify({'success': True, 'player_id': player_id})
         except Exception as e:
             return jsonify({'error': str(e)}), 500
     
     @app.route('/api/game/leaderboard/stats')
     def get_leaderboard_stats():
         """获取排行榜统计信息"""
-        response = jsonify(leaderboard.get_stats())
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        return response
+        return jsonify(leaderboard.get_stats())
     
     @app.route('/api/performance')
     def get_performance_stats():
         """获取服务器性能统计信息"""
         # 计算平均响应时间
-        avg_response_time = 0
-        if performance_data['request_times']:
-            avg_response_time = sum(performance_data['request_times']) / len(performance_data['request_times'])
+        avg_response_time = performance_data['request_times'].mean()
         
         # 获取系统资源使用情况
-        process = psutil.Process()
         memory_info = process.memory_info()
-        cpu_percent = process.cpu_percent(interval=0.1)
         
         # 计算服务器运行时间
         uptime = time.time() - performance_data['start_time']
         
         stats = {
             'uptime': uptime,
-            'total_requests': performance_data['total_requests'],
-            'error_count': performance_data['error_count'],
+            'total_requests': performance_data['total_requests'].value,
+            'error_count': performance_data['error_count'].value,
             'avg_response_time': avg_response_time,
             'memory_usage': memory_info.rss / (1024 * 1024),  # 转换为MB
-            'cpu_usage': cpu_percent,
+            'cpu_usage': cpu_sampler.value,
             'active_games': len(games),
             'active_rooms': len(rooms)
         }
         
-        response = jsonify(stats)
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
-        return response
+        return jsonify(stats)
     
     @socketio.on('connect')
     def handle_connect():
@@ -332,75 +647,114 @@ def create_app():
     def handle_disconnect():
         """处理断开连接"""
         print(f'Client disconnected: {request.sid}')
-        
-        # 清理游戏状态
-        session_id = session.get('session_id')
-        if session_id and session_id in games:
-            del games[session_id]
+        # 游戏状态保留到闲置过期，断线重连后可以继续
     
     @socketio.on('join_room')
     def handle_join_room(data):
         """加入房间"""
         room_id = data.get('room_id', 'default')
         
-        if room_id not in rooms:
-            rooms[room_id] = {
-                'players': set(),
-                'game': Game2048(4)
-            }
-        
-        rooms[room_id]['players'].add(request.sid)
+        room = rooms.get_or_create(room_id, Room)
+        if room_redis is not None:
+            # 房间已存在时保留Redis中的状态，玩家集合在所有进程间共享
+            pipe = room_redis.pipeline()
+            pipe.set(ROOM_STATE_PREFIX + room_id, app.json.dumps(room.game.get_state(raw_grid=RAW_GRID)),
+                     nx=True, ex=GAME_TTL)
+            pipe.sadd(ROOM_PLAYERS_PREFIX + room_id, request.sid)
+            pipe.expire(ROOM_PLAYERS_PREFIX + room_id, GAME_TTL)
+            pipe.scard(ROOM_PLAYERS_PREFIX + room_id)
+            players_count = pipe.execute()[-1]
+        else:
+            players_count = room.add_player(request.sid)
         join_room(room_id)
         
         emit('room_joined', {
             'room_id': room_id,
-            'players_count': len(rooms[room_id]['players'])
+            'players_count': players_count
         })
     
+    def apply_room_action_redis(room_id, room, action, data) -> bool:
+        """读取Redis中的房间状态、执行动作后写回（调用方持有房间锁）
+        
+        WATCH住状态键，其他进程在此期间修改了房间时EXEC失败并重试，不会丢失更新；
+        状态键已过期时以本进程中的房间状态为准重新写入
+        """
+        key = ROOM_STATE_PREFIX + room_id
+        with room_redis.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    if raw is not None:
+                        room.game.set_state(app.json.loads(raw))
+                    if not room.apply_action(action, data):
+                        return False
+                    pipe.multi()
+                    pipe.set(key, app.json.dumps(room.game.get_state(raw_grid=RAW_GRID)), ex=GAME_TTL)
+                    pipe.execute()
+                    return True
+                except redis.WatchError:
+                    continue
+    
+    def broadcast_room_state(room_id, room):
+        """等待一个广播窗口后把房间的最新状态广播一次"""
+        socketio.sleep(BROADCAST_WINDOW)
+        with room.lock:
+            room.broadcast_pending = False
+            state = room.game.get_state()
+        if room_redis is not None:
+            # 其他进程可能在窗口内又修改了房间，广播Redis中的最新状态
+            raw = room_redis.get(ROOM_STATE_PREFIX + room_id)
+            if raw is not None:
+                state = app.json.loads(raw)
+        socketio.emit('game_state', state, to=room_id)
+    
     @socketio.on('game_action')
     def handle_game_action(data):
         """处理游戏动作"""
         room_id = data.get('room_id', 'default')
         action = data.get('action')
         
-        if room_id not in rooms:
-            return
-        
-        game = rooms[room_id]['game']
-        moved = False
+        if room_redis is not None:
+            room = rooms.get(room_id)
+            if room is None:
+                # 房间可能是在其他进程中创建的
+                if not room_redis.exists(ROOM_STATE_PREFIX + room_id):
+                    return
+                room = rooms.get_or_create(room_id, Room)
+        else:
+            room = rooms.get(room_id)
+            if room is None:
+                return
         
-        if action == 'move_left':
-            moved = game.move_left()
-        elif action == 'move_right':
-            moved = game.move_right()
-        elif action == 'move_up':
-            moved = game.move_up()
-        elif action == 'move_down':
-            moved = game.move_down()
-        elif action == 'new_game':
-            size = data.get('size', 4)
-            game = Game2048(size)
-            rooms[room_id]['game'] = game
-            moved = True
+        # 同一房间的动作依次执行，避免多个玩家同时修改同一局游戏
+        with room.lock:
+            if room_redis is not None:
+                moved = apply_room_action_redis(room_id, room, action, data)
+            else:
+                moved = room.apply_action(action, data)
+            
+            # 窗口内的连续动作只广播最终状态
+            schedule = moved and not room.broadcast_pending
+            if schedule:
+                room.broadcast_pending = True
         
-        if moved:
+        if schedule:
             # 广播游戏状态给房间内的所有玩家
-            emit('game_state', game.get_state(), room=room_id)
+            socketio.start_background_task(broadcast_room_state, room_id, room)
     
+    # 浏览器缓存页面并用If-Modified-Since/ETag重新验证，未修改时返回304不读文件
     @app.route('/updates')
+    @app.route('/updates.html')
     def updates():
-        return send_file('../updates.html')
+        return send_from_directory(BASE_DIR, 'updates.html', max_age=STATIC_PAGE_MAX_AGE)
 
     @app.route('/welcome')
+    @app.route('/welcome.html')
     def welcome():
-        return send_file('../welcome.html')
+        return send_from_directory(BASE_DIR, 'welcome.html', max_age=STATIC_PAGE_MAX_AGE)
 
-    @app.route('/updates.html')
-    def updates_html():
-        return send_file('../updates.html')
-
-    @app.route('/welcome.html')
-    def welcome_html():
-        return send_file('../welcome.html')
+    # 所有路由注册完成后立即整理URL规则，避免第一个请求时再排序
+    app.url_map.update()
 
     return app
\ No newline at end of file
@@ -10,6 +10,14 @@ import os
 from datetime import datetime
 from typing import List, Dict, Any
 
+from server.redis_client import get_redis
+
+# 排行榜最多保留的玩家数
+MAX_ENTRIES = 100
+
+# 服务器缓存序列化后排行榜JSON所用的Redis键，排行榜变化时一并删除
+LEADERBOARD_CACHE_KEY = "lb:json:v1"
+
 class LeaderboardManager:
     """排行榜管理器"""
     
@@ -71,7 +79,7 @@ class LeaderboardManager:
         
         # 按分数排序，保留前100名
         self.scores.sort(key=lambda x: x['score'], reverse=True)
-        self.scores = self.scores[:100]
+        self.scores = self.scores[:MAX_ENTRIES]
         
         self.save_scores()
     
@@ -114,5 +122,112 @@ class LeaderboardManager:
             'most_common_size': most_common_size
         }
 
+# 更新分数的Lua脚本：只在分数更高时写入分数和玩家信息，裁剪到前N名并删除被挤出玩家的信息，
+# 最后清除JSON缓存，全部在Redis中原子执行，一次往返完成
+# KEYS: 有序集合, JSON缓存键
+# ARGV: 玩家名, 分数, 玩家信息键前缀, 保留名次, max_tile, moves, size, timestamp, date
+ADD_SCORE_SCRIPT = """
+local changed = redis.call('ZADD', KEYS[1], 'GT', 'CH', ARGV[2], ARGV[1])
+if changed == 0 then
+    return 0
+end
+redis.call('HSET', ARGV[3] .. ARGV[1], 'max_tile', ARGV[5], 'moves', ARGV[6],
+           'size', ARGV[7], 'timestamp', ARGV[8], 'date', ARGV[9])
+local last = -(tonumber(ARGV[4]) + 1)
+local dropped = redis.call('ZRANGE', KEYS[1], 0, last)
+if #dropped > 0 then
+    redis.call('ZREMRANGEBYRANK', KEYS[1], 0, last)
+    for _, name in ipairs(dropped) do
+        redis.call('DEL', ARGV[3] .. name)
+    end
+end
+redis.call('DEL', KEYS[2])
+return 1
+"""
+
+class RedisLeaderboardManager:
+    """基于Redis有序集合的排行榜管理器，接口与LeaderboardManager一致
+    
+    分数存放在有序集合lb:v1中，其余字段存放在哈希lb:v1:meta:<玩家名>中；
+    修改数据格式时提升版本号即可整体失效旧数据
+    """
+    
+    KEY = "lb:v1"
+    META_PREFIX = "lb:v1:meta:"
+    
+    def __init__(self, client):
+        self.r = client
+        self._add_score = client.register_script(ADD_SCORE_SCRIPT)
+    
+    def add_score(self, score: int, max_tile: int, moves: int, size: int, player_name: str = "匿名玩家"):
+        """添加新分数到排行榜（兼容旧方法）"""
+        self.add_or_update_score(player_name, score, max_tile, moves, size)
+    
+    def add_or_update_score(self, player_name: str, score: int, max_tile: int, moves: int, size: int):
+        """更新或添加玩家分数（同一个玩家只保留最高分）"""
+        # 分数和玩家信息在同一个脚本中原子更新，并发提交时信息总是对应最高分
+        now = datetime.now()
+        self._add_score(
+            keys=[self.KEY, LEADERBOARD_CACHE_KEY],
+            args=[player_name, score, self.META_PREFIX, MAX_ENTRIES,
+                  max_tile, moves, size, now.isoformat(), now.strftime('%Y-%m-%d %H:%M')]
+        )
+    
+    def _fetch_entries(self, ranked) -> List[Dict[str, Any]]:
+        """批量读取玩家信息，组装成与本地排行榜相同格式的记录"""
+        pipe = self.r.pipeline()
+        for name, _ in ranked:
+            pipe.hgetall(self.META_PREFIX + name)
+        metas = pipe.execute()
+        
+        return [{
+            'score': int(score),
+            'max_tile': int(meta.get('max_tile', 0)),
+            'moves': int(meta.get('moves', 0)),
+            'size': int(meta.get('size', 4)),
+            'player_name': name,
+            'timestamp': meta.get('timestamp', ''),
+            'date': meta.get('date', '')
+        } for (name, score), meta in zip(ranked, metas)]
+    
+    def get_top_scores(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """获取排行榜前N名"""
+        ranked = self.r.zrevrange(self.KEY, 0, limit - 1, withscores=True)
+        return self._fetch_entries(ranked)
+    
+    def get_rank_by_score(self, score: int) -> int:
+        """根据分数获取排名"""
+        return self.r.zcount(self.KEY, f"({score}", "+inf") + 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取排行榜统计信息"""
+        scores = self._fetch_entries(self.r.zrevrange(self.KEY, 0, -1, withscores=True))
+        if not scores:
+            return {
+                'total_players': 0,
+                'highest_score': 0,
+                'average_score': 0,
+                'most_common_size': 4
+            }
+        
+        total_players = len(scores)
+        size_counts = {}
+        for entry in scores:
+            size_counts[entry['size']] = size_counts.get(entry['size'], 0) + 1
+        
+        return {
+            'total_players': total_players,
+            'highest_score': scores[0]['score'],
+            'average_score': sum(s['score'] for s in scores) // total_players,
+            'most_common_size': max(size_counts.items(), key=lambda x: x[1])[0]
+        }
+
+def create_leaderboard():
+    """配置了Redis时使用Redis排行榜，否则使用本地文件排行榜"""
+    client = get_redis()
+    if client is not None:
+        return RedisLeaderboardManager(client)
+    return LeaderboardManager()
+
 # 全局排行榜实例
-leaderboard = LeaderboardManager()
\ No newline at end of file
+leaderboard = create_leaderboard()
\ No newline at end of file
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Redis连接管理
+配置了server.redis_url且安装了redis库时提供共享的Redis客户端，
+否则返回None，由调用方使用进程内的实现
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+from utils.config import GameConfig
+
+@lru_cache(maxsize=2)
+def get_redis(decode_responses: bool = True) -> Optional["redis.Redis"]:
+    """获取共享的Redis客户端，未配置或连接失败时返回None
+    
+    decode_responses为False时返回字节，供Flask-Session等自行序列化的场景使用
+    """
+    if not REDIS_AVAILABLE:
+        return None
+    
+    url = GameConfig().get('server.redis_url')
+    if not url:
+        return None
+    
+    try:
+        client = redis.Redis.from_url(url, decode_responses=decode_responses, socket_connect_timeout=1)
+        client.ping()
+        return client
+    except redis.RedisError as e:
+        print(f"连接Redis失败: {e}，使用本地存储")
+        return None
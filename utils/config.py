@@ -23,7 +23,8 @@ class GameConfig:
             "server": {
                 "host": "0.0.0.0",
                 "port": 5000,
-                "debug": False
+                "debug": False,
+                "redis_url": ""  # 如 redis://localhost:6379/0，留空则不使用Redis
             },
             "ui": {
                 "window_width": 800,
@@ -6,6 +6,7 @@
 """
 
 import re
+from functools import lru_cache
 from typing import Dict, Optional
 
 class DeviceDetector:
@@ -112,7 +113,12 @@ class DeviceDetector:
 # Flask集成
 from flask import request
 
+@lru_cache(maxsize=4096)
+def _device_for(user_agent: str) -> Dict[str, str]:
+    """按User-Agent缓存检测结果（返回的字典是共享的，调用方不要修改）"""
+    return DeviceDetector.detect_device(user_agent)
+
 def get_device_info() -> Dict[str, str]:
     """从Flask请求中获取设备信息"""
     user_agent = request.headers.get('User-Agent', '')
-    return DeviceDetector.detect_device(user_agent)
\ No newline at end of file
+    return _device_for(user_agent)
\ No newline at end of file